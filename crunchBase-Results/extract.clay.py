@@ -5,72 +5,255 @@ Enhanced Clay Lead Scraper for React/SPA HTML - v2
 """
 
 import re
+import os
+import sys
+import glob
 import pandas as pd
 import argparse
 from bs4 import BeautifulSoup
 import json
+import time
 import urllib.parse
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 
-def extract_leads_from_clay_html(html_content):
-    """Extract leads from Clay HTML using multiple improved strategies"""
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "data_extractor"))
+from text_normalize import HTML_TAG_RE, normalize_space, strip_tags
+
+LINKEDIN_URL_RE = re.compile(r'https://www\.linkedin\.com/in/([a-zA-Z0-9-]+)/?', re.IGNORECASE)
+# Lead fields in export order; also the Clay grid headers read by column
+LEAD_COLUMNS = [
+    'Find people', 'Company Name', 'First Name', 'Last Name', 'Full Name',
+    'Job Title', 'Location', 'Company Domain', 'LinkedIn Profile',
+    'Enrich person', 'Connections'
+]
+# Fields a rendered grid row fills; a profile with all of them is not extracted again
+COMPLETE_COLUMNS = ['Company Name', 'Full Name', 'Job Title', 'Location', 'Company Domain']
+# Profile URLs in script JSON with escaped slashes, which index_linkedin_urls cannot see
+ESCAPED_LINKEDIN_URL_RE = re.compile(r'linkedin\.com\\(?:/|u002f)in\\', re.IGNORECASE)
+# Fields the text around an embedded URL can supply
+CONTEXT_COLUMNS = ['Full Name', 'Job Title', 'Company Name']
+# Characters of raw HTML taken either side of a LinkedIn URL as its lead's context
+CONTEXT_RADIUS = 3000
+
+class StrippedHtml:
+    """Tag-stripped copy of a document (tags become spaces) with a map from raw offsets into it"""
+    
+    def __init__(self, html_content):
+        pieces = []
+        self.raw_starts = []       # raw offset where each text run begins
+        self.stripped_starts = []  # offset of that run in the stripped text
+        self.run_lengths = []
+        pos = out = 0
+        for tag in HTML_TAG_RE.finditer(html_content):
+            self.raw_starts.append(pos)
+            self.stripped_starts.append(out)
+            self.run_lengths.append(tag.start() - pos)
+            pieces.append(html_content[pos:tag.start()])
+            pieces.append(' ')
+            out += tag.start() - pos + 1
+            pos = tag.end()
+        self.raw_starts.append(pos)
+        self.stripped_starts.append(out)
+        self.run_lengths.append(len(html_content) - pos)
+        pieces.append(html_content[pos:])
+        self.text = ''.join(pieces)
+    
+    def offset(self, raw_pos):
+        """Stripped offset of raw_pos; a position inside a tag maps to that tag's space"""
+        run = bisect_right(self.raw_starts, raw_pos) - 1
+        return self.stripped_starts[run] + min(raw_pos - self.raw_starts[run], self.run_lengths[run])
+    
+    def window(self, raw_start, raw_end):
+        return self.text[self.offset(raw_start):self.offset(raw_end)]
+
+def index_linkedin_urls(html_content):
+    """Map each LinkedIn profile ID to the offset of its canonical URL, in order of first appearance
+    
+    The offset is None when the ID only ever appears in a non-canonical form
+    (other casing or no trailing slash), which leaves that lead without context.
+    """
+    offsets = {}
+    for match in LINKEDIN_URL_RE.finditer(html_content):
+        linkedin_id = match.group(1)
+        if offsets.get(linkedin_id) is None:
+            canonical = match.group(0) == f"https://www.linkedin.com/in/{linkedin_id}/"
+            offsets[linkedin_id] = match.start() if canonical else None
+    return offsets
+
+def extract_leads_from_clay_html(html_content, skip_profiles=frozenset()):
+    """Extract leads from Clay HTML, running strategies in order of cost until every profile is complete
     
-    soup = BeautifulSoup(html_content, 'html.parser')
-    leads = []
+    The Clay grid goes first when the page has one, since it alone fills every
+    column. Embedded URLs need no parse and run only for profiles still lacking
+    a name, title or company; script data runs only when a script may hold
+    profiles the URL index cannot see, and the other fallbacks and the raw text pass
+    run only when the cheaper strategies leave something they could supply.
+    Profiles in skip_profiles (LinkedIn URLs already extracted from an earlier
+    snapshot) are dropped before any per-row extraction runs.
+    """
     
-    print("🔍 Analyzing Clay HTML structure...")
+    soup = None
+    merged = {}
     
-    # Strategy 1: Extract from data attributes and URLs
-    leads_from_urls = extract_from_embedded_urls(html_content, soup)
-    if leads_from_urls:
-        leads.extend(leads_from_urls)
-        print(f"✅ Strategy 1: Found {len(leads_from_urls)} leads from embedded URLs")
-    
-    # Strategy 2: Extract from script tags with data
-    leads_from_scripts = extract_from_script_data(html_content, soup)
-    if leads_from_scripts:
-        leads.extend(leads_from_scripts)
-        print(f"✅ Strategy 2: Found {len(leads_from_scripts)} leads from script data")
-    
-    # Strategy 3: Extract from table-like structures
-    leads_from_table = extract_from_table_structure(soup)
-    if leads_from_table:
-        leads.extend(leads_from_table)
-        print(f"✅ Strategy 3: Found {len(leads_from_table)} leads from table structure")
-    
-    # Strategy 4: Brute force text extraction
-    if not leads:
-        leads_from_text = extract_from_raw_text(html_content)
-        if leads_from_text:
-            leads.extend(leads_from_text)
-            print(f"✅ Strategy 4: Found {len(leads_from_text)} leads from raw text")
-    
-    # Remove duplicates based on LinkedIn URL
-    unique_leads = []
-    seen_urls = set()
+    print("🔍 Analyzing Clay HTML structure...")
     
+    # One regex pass lists every profile on the page; the planner works against it
+    linkedin_offsets = index_linkedin_urls(html_content)
+    profiles = [url for url in (f"https://www.linkedin.com/in/{linkedin_id}/" for linkedin_id in linkedin_offsets)
+                if url not in skip_profiles]
+    
+    # Strategy 3: Clay grid columns (skipped without a header, checked on the raw text first)
+    columns = {}
+    if GRID_HEADER_ID_PREFIX in html_content:
+        soup = BeautifulSoup(html_content, 'html.parser')
+        columns = index_grid_columns(soup)
+    if columns:
+        run_strategy(3, 'grid columns', merged, lambda: extract_from_grid(soup, columns, skip_profiles))
+    
+    # Strategy 1: context around embedded URLs, for profiles missing a field it can supply
+    pending = profiles_missing(profiles, merged, CONTEXT_COLUMNS)
+    if pending:
+        done = skip_profiles | (set(profiles) - pending)
+        run_strategy(1, 'embedded URLs', merged,
+                     lambda: extract_from_embedded_urls(html_content, linkedin_offsets, done, merged))
+    elif profiles:
+        print("⏩ Strategy 1 (embedded URLs): skipped, no profile is missing a name, title or company")
+    
+    # Strategy 2: script data only yields bare URLs. The index sees every plain one,
+    # so it runs when the index found none or a script escapes a profile URL's slashes
+    if not linkedin_offsets or ESCAPED_LINKEDIN_URL_RE.search(html_content):
+        if soup is None:
+            soup = BeautifulSoup(html_content, 'html.parser')
+        known = skip_profiles | set(merged)
+        run_strategy(2, 'script data', merged, lambda: extract_from_script_data(html_content, soup, known))
+    
+    if linkedin_offsets and not profiles_missing(profiles, merged, COMPLETE_COLUMNS):
+        print(f"⏩ All {len(merged)} profiles complete; skipping the remaining strategies")
+        return list(merged.values())
+    
+    # Strategy 3 fallback: generic table rows, which only guess names
+    unnamed = profiles_missing(profiles, merged, ['Full Name'])
+    if not columns and (unnamed or not linkedin_offsets):
+        if soup is None:
+            soup = BeautifulSoup(html_content, 'html.parser')
+        named = skip_profiles | (set(merged) - unnamed)
+        run_strategy(3, 'table structure', merged, lambda: extract_from_table_rows(soup, named))
+    
+    # Strategy 4: Brute force text extraction, only for pages with no profile URL at all
+    if not merged and not linkedin_offsets:
+        run_strategy(4, 'raw text', merged, lambda: extract_from_raw_text(html_content, skip_profiles))
+    
+    return list(merged.values())
+
+def run_strategy(number, label, merged, extract):
+    """Run one strategy, merge its leads into merged, and report its timing and yield"""
+    started = time.perf_counter()
+    leads = extract()
+    known_before = len(merged)
+    filled_before = sum(1 for lead in merged.values() for value in lead.values() if value)
+    merge_leads(merged, leads)
+    new = len(merged) - known_before
+    filled = sum(1 for lead in merged.values() for value in lead.values() if value) - filled_before
+    print(f"✅ Strategy {number} ({label}): Found {len(leads)} leads, {new} new, "
+          f"{filled} fields filled in {time.perf_counter() - started:.3f}s")
+
+def profiles_missing(profiles, merged, columns):
+    """Profiles (from the page index or already merged) whose record lacks any of columns"""
+    missing = set()
+    for profile in dict.fromkeys([*profiles, *merged]):
+        lead = merged.get(profile)
+        if lead is None or not all(lead.get(column) for column in columns):
+            missing.add(profile)
+    return missing
+
+def merge_leads(merged, leads):
+    """Merge leads into merged, keyed by LinkedIn URL; the first record wins and later ones only fill its empty fields"""
     for lead in leads:
-        linkedin_url = lead.get('LinkedIn Profile', '')
-        if linkedin_url and linkedin_url not in seen_urls:
-            seen_urls.add(linkedin_url)
-            unique_leads.append(lead)
-        elif not linkedin_url and lead.get('Full Name'):
+        key = lead.get('LinkedIn Profile', '')
+        if not key:
             # Keep leads without LinkedIn but with names
-            unique_leads.append(lead)
+            if not lead.get('Full Name'):
+                continue
+            key = f"name:{lead['Full Name']}"
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = dict(lead)
+            continue
+        for column, value in lead.items():
+            if value and not existing.get(column):
+                existing[column] = value
+    return merged
+
+def lead_is_complete(lead):
+    return all(lead.get(column) for column in COMPLETE_COLUMNS)
+
+def find_snapshots(directory):
+    """Clay HTML snapshots in directory, in natural order (clay-Loop-2 before clay-Loop-10)"""
+    def natural_key(path):
+        return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', os.path.basename(path))]
     
-    return unique_leads
+    return sorted(glob.glob(os.path.join(directory, '*.html')), key=natural_key)
 
-def extract_from_embedded_urls(html_content, soup):
-    """Extract data from URLs embedded in the HTML"""
-    leads = []
+def process_snapshots(paths):
+    """Extract and merge consecutive snapshots, skipping profiles an earlier one already completed"""
+    merged = {}
+    complete = set()
+    for path in paths:
+        print(f"📁 Processing: {path}")
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            html_content = f.read()
+        
+        leads = extract_leads_from_clay_html(html_content, complete)
+        merge_leads(merged, leads)
+        for lead in leads:
+            profile = lead.get('LinkedIn Profile')
+            if profile and lead_is_complete(merged[profile]):
+                complete.add(profile)
+    
+    return list(merged.values())
+
+def extract_snapshots(paths, workers=1):
+    """Extract leads from many overlapping snapshots and merge them by LinkedIn URL
+    
+    Neighbouring scroll snapshots overlap, so each worker takes a contiguous
+    run of them; only the rows at the seams between runs are extracted twice.
+    """
+    if not paths:
+        return []
+    workers = max(1, min(workers, len(paths)))
+    run_length = -(-len(paths) // workers)
+    runs = [paths[i:i + run_length] for i in range(0, len(paths), run_length)]
+    
+    if len(runs) <= 1:
+        results = [process_snapshots(paths)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(runs)) as pool:
+            results = list(pool.map(process_snapshots, runs))
+    
+    merged = {}
+    for leads in results:
+        merge_leads(merged, leads)
+    return list(merged.values())
+
+def extract_from_embedded_urls(html_content, linkedin_offsets, skip_profiles=frozenset(), known=None):
+    """Extract data from the LinkedIn URLs indexed by index_linkedin_urls
     
-    # Find all LinkedIn URLs in the entire HTML
-    linkedin_pattern = r'https://www\.linkedin\.com/in/([a-zA-Z0-9-]+)/?'
-    linkedin_matches = list(set(re.findall(linkedin_pattern, html_content, re.IGNORECASE)))
+    Fields a lead in known (keyed by LinkedIn URL) already has are not extracted again.
+    """
+    known = known or {}
+    leads = []
     
-    print(f"📊 Found {len(linkedin_matches)} unique LinkedIn profiles")
+    print(f"📊 Found {len(linkedin_offsets)} unique LinkedIn profiles")
     
-    for linkedin_id in linkedin_matches:
+    pending = {}
+    for linkedin_id, url_pos in linkedin_offsets.items():
         linkedin_url = f"https://www.linkedin.com/in/{linkedin_id}/"
+        if linkedin_url not in skip_profiles:
+            pending[linkedin_url] = url_pos
+    stripped = StrippedHtml(html_content) if pending else None
+    
+    for linkedin_url, url_pos in pending.items():
         
         lead = {
             'Find people': '',
@@ -87,10 +270,13 @@ def extract_from_embedded_urls(html_content, soup):
         }
         
         # Try to find associated data near this LinkedIn URL
-        url_context = extract_context_around_url(html_content, linkedin_url)
+        url_context = extract_context_around_url(stripped, url_pos)
+        found = known.get(linkedin_url, {})
         if url_context:
+            context = LeadContext(url_context)
+            
             # Extract name from context
-            name = extract_name_from_context(url_context)
+            name = None if found.get('Full Name') else context.name()
             if name:
                 lead['Full Name'] = name
                 lead['Find people'] = name
@@ -100,12 +286,12 @@ def extract_from_embedded_urls(html_content, soup):
                     lead['Last Name'] = ' '.join(name_parts[1:])
             
             # Extract job title from context
-            title = extract_title_from_context(url_context)
+            title = None if found.get('Job Title') else context.title()
             if title:
                 lead['Job Title'] = title
             
             # Extract company from context
-            company = extract_company_from_context(url_context)
+            company = None if found.get('Company Name') else context.company()
             if company:
                 lead['Company Name'] = company
         
@@ -113,97 +299,123 @@ def extract_from_embedded_urls(html_content, soup):
     
     return leads
 
-def extract_context_around_url(html_content, url):
-    """Extract context around a LinkedIn URL"""
-    url_pos = html_content.find(url)
-    if url_pos == -1:
+def extract_context_around_url(stripped, url_pos):
+    """Tag-stripped text within CONTEXT_RADIUS raw characters of a LinkedIn URL"""
+    if url_pos is None:
         return ""
     
-    # Get 3000 characters before and after the URL
-    start = max(0, url_pos - 3000)
-    end = min(len(html_content), url_pos + 3000)
-    context = html_content[start:end]
-    
-    return context
+    return stripped.window(max(0, url_pos - CONTEXT_RADIUS), url_pos + CONTEXT_RADIUS)
 
-def extract_name_from_context(context):
-    """Extract person name from context"""
-    # Remove HTML tags for cleaner text processing
-    clean_context = re.sub(r'<[^>]+>', ' ', context)
-    
-    name_patterns = [
-        # Names in quotes
-        r'"([A-Z][a-zA-Z]+ [A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)?)"',
-        # Names with proper capitalization
-        r'\b([A-Z][a-z]+ [A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\b',
-        # Names in title attributes
-        r'title="([A-Z][a-zA-Z]+ [A-Z][a-zA-Z]+)"',
-        # Names after common keywords
-        r'(?:name|person|user|profile)[\s:]+([A-Z][a-zA-Z]+ [A-Z][a-zA-Z]+)',
-    ]
-    
-    for pattern in name_patterns:
-        matches = re.findall(pattern, clean_context)
-        for match in matches:
-            # Filter out common false positives
-            if (len(match) > 4 and len(match) < 50 and 
-                not any(word in match.lower() for word in [
-                    'linkedin', 'profile', 'company', 'click', 'button', 'header',
-                    'table', 'cell', 'view', 'data', 'content', 'text', 'link',
-                    'find', 'search', 'filter', 'sort', 'first', 'last', 'full'
-                ])):
-                return match.strip()
-    
-    return None
+NAME_PATTERNS = [re.compile(pattern) for pattern in [
+    # Names in quotes
+    r'"([A-Z][a-zA-Z]+ [A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)?)"',
+    # Names with proper capitalization
+    r'\b([A-Z][a-z]+ [A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\b',
+    # Names in title attributes
+    r'title="([A-Z][a-zA-Z]+ [A-Z][a-zA-Z]+)"',
+    # Names after common keywords
+    r'(?:name|person|user|profile)[\s:]+([A-Z][a-zA-Z]+ [A-Z][a-zA-Z]+)',
+]]
+NAME_STOPWORDS = [
+    'linkedin', 'profile', 'company', 'click', 'button', 'header',
+    'table', 'cell', 'view', 'data', 'content', 'text', 'link',
+    'find', 'search', 'filter', 'sort', 'first', 'last', 'full'
+]
 
-def extract_title_from_context(context):
-    """Extract job title from context"""
-    clean_context = re.sub(r'<[^>]+>', ' ', context)
-    
-    title_patterns = [
-        # Common job titles
-        r'\b([A-Z][^.]*?(?:CEO|CTO|CFO|COO|Director|Manager|Engineer|Developer|Analyst|Specialist|Coordinator|Assistant|Lead|Senior|Junior)[^.]*?)\b',
-        # Titles in quotes
-        r'"([^"]*(?:CEO|CTO|CFO|COO|Director|Manager|Engineer|Developer|Analyst)[^"]*)"',
-        # Titles after "at" or "of"
-        r'\bat\s+([A-Z][^.]+?)(?:\s|$)',
-        r'\bof\s+([A-Z][^.]+?)(?:\s|$)',
-    ]
-    
-    for pattern in title_patterns:
-        matches = re.findall(pattern, clean_context, re.IGNORECASE)
-        for match in matches:
-            if len(match) > 3 and len(match) < 100:
-                return match.strip()
-    
-    return None
+TITLE_KEYWORDS = 'CEO|CTO|CFO|COO|Director|Manager|Engineer|Developer|Analyst|Specialist|Coordinator|Assistant|Lead|Senior|Junior'
+# Common job titles; this one is run per sentence by LeadContext.title
+KEYWORD_TITLE_RE = re.compile(rf'\b([A-Z][^.]*?(?:{TITLE_KEYWORDS})[^.]*?)\b', re.IGNORECASE)
+TITLE_KEYWORD_RE = re.compile(TITLE_KEYWORDS, re.IGNORECASE)
+WORD_TAIL_RE = re.compile(r'\w*')
+TITLE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Titles in quotes
+    r'"([^"]*(?:CEO|CTO|CFO|COO|Director|Manager|Engineer|Developer|Analyst)[^"]*)"',
+    # Titles after "at" or "of"
+    r'\bat\s+([A-Z][^.]+?)(?:\s|$)',
+    r'\bof\s+([A-Z][^.]+?)(?:\s|$)',
+]]
 
-def extract_company_from_context(context):
-    """Extract company name from context"""
-    clean_context = re.sub(r'<[^>]+>', ' ', context)
-    
-    company_patterns = [
-        # Company names with "Inc", "Corp", "LLC", etc.
-        r'\b([A-Z][A-Za-z\s&]+(?:Inc|Corp|LLC|Ltd|Company|Technologies|Solutions|Systems))\b',
-        # Companies after "at"
-        r'\bat\s+([A-Z][A-Za-z\s&]{2,30}?)(?:\s|$)',
-        # Companies in quotes
-        r'"([A-Z][A-Za-z\s&]{3,30})"',
-    ]
+COMPANY_PATTERNS = [re.compile(pattern) for pattern in [
+    # Company names with "Inc", "Corp", "LLC", etc.
+    r'\b([A-Z][A-Za-z\s&]+(?:Inc|Corp|LLC|Ltd|Company|Technologies|Solutions|Systems))\b',
+    # Companies after "at"
+    r'\bat\s+([A-Z][A-Za-z\s&]{2,30}?)(?:\s|$)',
+    # Companies in quotes
+    r'"([A-Z][A-Za-z\s&]{3,30})"',
+]]
+COMPANY_STOPWORDS = [
+    'linkedin', 'profile', 'company name', 'find people',
+    'first name', 'last name', 'job title', 'location'
+]
+
+class LeadContext:
+    """Text around one lead, tag-stripped once and shared by the name, title and company extractors
+    
+    Each extractor tries its patterns in order and stops at the first accepted match.
+    """
+    
+    def __init__(self, context):
+        self.text = strip_tags(context)
+    
+    def name(self):
+        """Extract person name from context"""
+        for pattern in NAME_PATTERNS:
+            for match in pattern.finditer(self.text):
+                name = match.group(1)
+                # Filter out common false positives
+                if 4 < len(name) < 50 and not any(word in name.lower() for word in NAME_STOPWORDS):
+                    return name.strip()
+        return None
     
-    for pattern in company_patterns:
-        matches = re.findall(pattern, clean_context)
-        for match in matches:
-            if (len(match) > 2 and len(match) < 50 and 
-                not any(word in match.lower() for word in [
-                    'linkedin', 'profile', 'company name', 'find people',
-                    'first name', 'last name', 'job title', 'location'
-                ])):
-                return match.strip()
+    def keyword_titles(self):
+        """KEYWORD_TITLE_RE matches in order, without its quadratic scans
+        
+        The pattern never crosses a '.', so it is run per sentence, and each sentence is
+        cut at the end of the word holding its last keyword: no match can extend past it,
+        and every start position after it would scan to the sentence end and fail.
+        """
+        for sentence in self.text.split('.'):
+            last_keyword = None
+            for last_keyword in TITLE_KEYWORD_RE.finditer(sentence):
+                pass
+            if last_keyword is None:
+                continue
+            end = WORD_TAIL_RE.match(sentence, last_keyword.end()).end()
+            for match in KEYWORD_TITLE_RE.finditer(sentence, 0, end):
+                yield match.group(1)
+    
+    def title(self):
+        """Extract job title from context"""
+        for title in self.keyword_titles():
+            if 3 < len(title) < 100:
+                return title.strip()
+        for pattern in TITLE_PATTERNS:
+            for match in pattern.finditer(self.text):
+                title = match.group(1)
+                if 3 < len(title) < 100:
+                    return title.strip()
+        return None
     
-    return None
+    def company(self):
+        """Extract company name from context"""
+        for pattern in COMPANY_PATTERNS:
+            for match in pattern.finditer(self.text):
+                company = match.group(1)
+                if 2 < len(company) < 50 and not any(word in company.lower() for word in COMPANY_STOPWORDS):
+                    return company.strip()
+        return None
+
+def extract_name_from_context(context):
+    """Extract person name from context"""
+    return LeadContext(context).name()
 
-def extract_from_script_data(html_content, soup):
+# Where Clay state starts inside a script: a window.__STATE__ assignment or a data array key
+SCRIPT_DATA_RE = re.compile(
+    r'window\.__[A-Z_]+__\s*=\s*(?=\{)|"(?:tableData|rows|people|leads)"\s*:\s*(?=\[)'
+)
+JSON_DECODER = json.JSONDecoder()
+
+def extract_from_script_data(html_content, soup, skip_profiles=frozenset()):
     """Extract data from JavaScript/JSON in script tags"""
     leads = []
     
@@ -211,57 +423,41 @@ def extract_from_script_data(html_content, soup):
     script_tags = soup.find_all('script')
     
     for script in script_tags:
-        if script.string:
-            script_content = script.string
-            
-            # Look for JSON-like structures
-            json_patterns = [
-                r'window\.__[A-Z_]+__\s*=\s*({.+?});',
-                r'"tableData"\s*:\s*(\[.+?\])',
-                r'"rows"\s*:\s*(\[.+?\])',
-                r'"people"\s*:\s*(\[.+?\])',
-                r'"leads"\s*:\s*(\[.+?\])',
-            ]
-            
-            for pattern in json_patterns:
-                matches = re.findall(pattern, script_content, re.DOTALL)
-                for match in matches:
-                    try:
-                        data = json.loads(match)
-                        extracted = process_json_data(data)
-                        if extracted:
-                            leads.extend(extracted)
-                    except:
-                        continue
+        script_content = script.string
+        # Only scripts mentioning LinkedIn can yield a lead; the slashes of a
+        # profile URL may be JSON-escaped (\/ or \u002F), so leave the path to the decoded walk
+        if not script_content or 'linkedin' not in script_content:
+            continue
+        
+        # Decode each located value in full; anything nested in one already walked is skipped
+        decoded_until = 0
+        for match in SCRIPT_DATA_RE.finditer(script_content):
+            if match.end() < decoded_until:
+                continue
+            try:
+                data, decoded_until = JSON_DECODER.raw_decode(script_content, match.end())
+            except (ValueError, RecursionError):
+                # Malformed, or nested deeper than the C decoder allows
+                continue
+            leads.extend(lead for lead in process_json_data(data)
+                         if lead['LinkedIn Profile'] not in skip_profiles)
     
     return leads
 
 def process_json_data(data):
-    """Process JSON data to extract lead information"""
-    leads = []
-    
-    if isinstance(data, dict):
-        # Process dictionary
-        for key, value in data.items():
-            if isinstance(value, (list, dict)):
-                leads.extend(process_json_data(value))
-            elif isinstance(value, str) and 'linkedin.com/in/' in value:
-                # Found a LinkedIn URL
-                lead = create_lead_from_linkedin_url(value)
-                if lead:
-                    leads.append(lead)
-    
-    elif isinstance(data, list):
-        # Process list
-        for item in data:
-            if isinstance(item, (dict, list)):
-                leads.extend(process_json_data(item))
-            elif isinstance(item, str) and 'linkedin.com/in/' in item:
-                lead = create_lead_from_linkedin_url(item)
-                if lead:
-                    leads.append(lead)
-    
-    return leads
+    """Walk JSON data iteratively, yielding a lead for every LinkedIn profile URL string in document order"""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, str) and 'linkedin.com/in/' in node:
+            # Found a LinkedIn URL
+            lead = create_lead_from_linkedin_url(node)
+            if lead:
+                yield lead
 
 def create_lead_from_linkedin_url(url):
     """Create a lead object from a LinkedIn URL"""
@@ -282,8 +478,25 @@ def create_lead_from_linkedin_url(url):
         }
     return None
 
-def extract_from_table_structure(soup):
-    """Extract data from table-like HTML structures"""
+# Clay's grid labels each column header with its field ID, and every body cell
+# carries data-cell-id="<field ID>.<row ID>"; cells are matched by field ID
+# because the grid virtualizes columns as well as rows
+GRID_HEADER_ID_PREFIX = 'table-header-cell-'
+GRID_HEADER_ID_RE = re.compile('^' + GRID_HEADER_ID_PREFIX)
+# Separates the field ID from the row ID in data-cell-id
+GRID_CELL_ID_SEP = '.'
+
+def index_grid_columns(soup):
+    """Map each Clay grid field ID to the lead column its header names"""
+    columns = {}
+    for header in soup.find_all(id=GRID_HEADER_ID_RE):
+        label = normalize_space(header.get_text(' '))
+        if label in LEAD_COLUMNS:
+            columns[header['id'][len(GRID_HEADER_ID_PREFIX):]] = label
+    return columns
+
+def extract_from_table_rows(soup, skip_profiles=frozenset()):
+    """Extract data from generic table rows, trying each row selector until one yields leads"""
     leads = []
     
     # Look for table rows or grid items
@@ -301,7 +514,7 @@ def extract_from_table_structure(soup):
             print(f"📋 Found {len(rows)} potential table rows with selector: {selector}")
             
             for row in rows:
-                lead = extract_lead_from_row(row)
+                lead = extract_lead_from_row(row, skip_profiles)
                 if lead:
                     leads.append(lead)
             
@@ -310,31 +523,67 @@ def extract_from_table_structure(soup):
     
     return leads
 
-def extract_lead_from_row(row):
-    """Extract lead data from a table row element"""
-    row_text = row.get_text()
-    row_html = str(row)
+def extract_from_grid(soup, columns, skip_profiles=frozenset()):
+    """Build one lead per Clay grid row from the cells of its mapped columns"""
+    rows = {}
+    for cell in soup.find_all(attrs={'data-cell-id': True}):
+        field_id, _, row_id = cell['data-cell-id'].partition(GRID_CELL_ID_SEP)
+        column = columns.get(field_id)
+        if column:
+            rows.setdefault(row_id, {})[column] = cell
+    
+    print(f"📋 Found {len(rows)} grid rows across {len(columns)} mapped columns")
     
-    # Extract LinkedIn URL
-    linkedin_match = re.search(r'https://www\.linkedin\.com/in/([a-zA-Z0-9-]+)', row_html)
-    if not linkedin_match:
+    leads = []
+    for cells in rows.values():
+        lead = extract_lead_from_grid_cells(cells, skip_profiles)
+        if lead:
+            leads.append(lead)
+    
+    return leads
+
+def extract_lead_from_grid_cells(cells, skip_profiles=frozenset()):
+    """Extract lead data from one grid row's cells, keyed by lead column"""
+    linkedin_cell = cells.get('LinkedIn Profile')
+    if linkedin_cell is None:
+        return None
+    link = linkedin_cell.find('a', href=True)
+    lead = create_lead_from_linkedin_url(link['href'] if link else linkedin_cell.get_text())
+    if not lead or lead['LinkedIn Profile'] in skip_profiles:
         return None
     
-    linkedin_url = f"https://www.linkedin.com/in/{linkedin_match.group(1)}/"
-    
-    lead = {
-        'Find people': '',
-        'Company Name': '',
-        'First Name': '',
-        'Last Name': '',
-        'Full Name': '',
-        'Job Title': '',
-        'Location': '',
-        'Company Domain': '',
-        'LinkedIn Profile': linkedin_url,
-        'Enrich person': '✓',
-        'Connections': ''
-    }
+    for column, cell in cells.items():
+        if column == 'LinkedIn Profile':
+            continue
+        value = normalize_space(cell.get_text(' '))
+        if value:
+            lead[column] = value
+    
+    # Fill whichever name columns the grid left empty from the others
+    if not lead['Full Name']:
+        lead['Full Name'] = ' '.join(filter(None, [lead['First Name'], lead['Last Name']])) or lead['Find people']
+    if lead['Full Name']:
+        if not lead['Find people']:
+            lead['Find people'] = lead['Full Name']
+        name_parts = lead['Full Name'].split()
+        if not lead['First Name'] and not lead['Last Name'] and len(name_parts) >= 2:
+            lead['First Name'] = name_parts[0]
+            lead['Last Name'] = ' '.join(name_parts[1:])
+    
+    return lead
+
+def extract_lead_from_row(row, skip_profiles=frozenset()):
+    """Extract lead data from a table row element"""
+    # Profile links sit in an href; fall back to URLs written out in the text
+    row_text = row.get_text()
+    linkedin_url = None
+    for link in row.find_all('a', href=True):
+        if 'linkedin.com/in/' in link['href']:
+            linkedin_url = link['href']
+            break
+    lead = create_lead_from_linkedin_url(linkedin_url or row_text)
+    if not lead or lead['LinkedIn Profile'] in skip_profiles:
+        return None
     
     # Extract name from row
     name = extract_name_from_context(row_text)
@@ -348,30 +597,44 @@ def extract_lead_from_row(row):
     
     return lead
 
-def extract_from_raw_text(html_content):
-    """Brute force extraction from raw text"""
-    leads = []
+# Characters of tag-stripped text taken either side of a URL by the raw text pass
+RAW_TEXT_RADIUS = 500
+RAW_NAME_PATTERNS = [re.compile(pattern) for pattern in [
+    r'\b([A-Z][a-z]+ [A-Z][a-z]+)\b',
+    r'\b([A-Z][a-z]+ [A-Z]\. [A-Z][a-z]+)\b',
+    r'\b([A-Z][a-z]+ [A-Z][a-z]+ [A-Z][a-z]+)\b'
+]]
+RAW_NAME_STOPWORDS = ['linkedin', 'profile', 'company', 'find', 'people']
+
+def extract_name_from_chunk(chunk):
+    """First plausible full name in a raw text chunk, trying each pattern in turn"""
+    for pattern in RAW_NAME_PATTERNS:
+        for name in pattern.findall(chunk):
+            if (len(name) > 4 and
+                not any(word in name.lower() for word in RAW_NAME_STOPWORDS)):
+                return name
+    return None
+
+def extract_from_raw_text(html_content, skip_profiles=frozenset()):
+    """Brute force extraction from raw text
     
-    # Remove HTML tags
-    clean_text = re.sub(r'<[^>]+>', ' ', html_content)
-    clean_text = re.sub(r'\s+', ' ', clean_text)
+    Every URL occurrence is read once, with its own surrounding window; a
+    repeated profile only looks at later windows while it still has no name.
+    """
+    leads = {}
     
-    # Find LinkedIn URLs
-    linkedin_pattern = r'https://www\.linkedin\.com/in/([a-zA-Z0-9-]+)/?'
-    linkedin_matches = re.findall(linkedin_pattern, clean_text)
+    # Remove HTML tags
+    clean_text = normalize_space(strip_tags(html_content))
     
-    # Split text into chunks around LinkedIn URLs
-    for linkedin_id in linkedin_matches:
-        linkedin_url = f"https://www.linkedin.com/in/{linkedin_id}/"
+    # Find LinkedIn URLs, taking each occurrence's offset straight from the match
+    for match in LINKEDIN_URL_RE.finditer(clean_text):
+        linkedin_url = f"https://www.linkedin.com/in/{match.group(1)}/"
+        if linkedin_url in skip_profiles:
+            continue
         
-        # Find the position and extract surrounding text
-        url_pos = clean_text.find(linkedin_url)
-        if url_pos != -1:
-            start = max(0, url_pos - 500)
-            end = min(len(clean_text), url_pos + 500)
-            chunk = clean_text[start:end]
-            
-            lead = {
+        lead = leads.get(linkedin_url)
+        if lead is None:
+            lead = leads[linkedin_url] = {
                 'Find people': '',
                 'Company Name': '',
                 'First Name': '',
@@ -384,34 +647,20 @@ def extract_from_raw_text(html_content):
                 'Enrich person': '✓',
                 'Connections': ''
             }
-            
-            # Try to extract name from chunk
-            name_patterns = [
-                r'\b([A-Z][a-z]+ [A-Z][a-z]+)\b',
-                r'\b([A-Z][a-z]+ [A-Z]\. [A-Z][a-z]+)\b',
-                r'\b([A-Z][a-z]+ [A-Z][a-z]+ [A-Z][a-z]+)\b'
-            ]
-            
-            for pattern in name_patterns:
-                names = re.findall(pattern, chunk)
-                for name in names:
-                    if (len(name) > 4 and 
-                        not any(word in name.lower() for word in [
-                            'linkedin', 'profile', 'company', 'find', 'people'
-                        ])):
-                        lead['Full Name'] = name
-                        lead['Find people'] = name
-                        parts = name.split()
-                        lead['First Name'] = parts[0]
-                        lead['Last Name'] = ' '.join(parts[1:])
-                        break
-                
-                if lead['Full Name']:
-                    break
-            
-            leads.append(lead)
-    
-    return leads
+        elif lead['Full Name']:
+            continue
+        
+        # Try to extract name from the text around this occurrence
+        chunk = clean_text[max(0, match.start() - RAW_TEXT_RADIUS):match.start() + RAW_TEXT_RADIUS]
+        name = extract_name_from_chunk(chunk)
+        if name:
+            lead['Full Name'] = name
+            lead['Find people'] = name
+            parts = name.split()
+            lead['First Name'] = parts[0]
+            lead['Last Name'] = ' '.join(parts[1:])
+    
+    return list(leads.values())
 
 def export_to_excel(leads, filename):
     """Export leads to Excel file"""
@@ -422,17 +671,11 @@ def export_to_excel(leads, filename):
     df = pd.DataFrame(leads)
     
     # Ensure column order
-    columns = [
-        'Find people', 'Company Name', 'First Name', 'Last Name', 'Full Name',
-        'Job Title', 'Location', 'Company Domain', 'LinkedIn Profile',
-        'Enrich person', 'Connections'
-    ]
-    
-    for col in columns:
+    for col in LEAD_COLUMNS:
         if col not in df.columns:
             df[col] = ''
     
-    df = df[columns].fillna('')
+    df = df[LEAD_COLUMNS].fillna('')
     
     try:
         df.to_excel(filename, index=False)
@@ -456,20 +699,28 @@ def export_to_excel(leads, filename):
 
 def main():
     parser = argparse.ArgumentParser(description='Enhanced Clay Lead Scraper v2')
-    parser.add_argument('input_file', help='Clay HTML file')
+    parser.add_argument('input_file', help='Clay HTML file, or a directory of scroll snapshots to merge')
     parser.add_argument('output_file', nargs='?', default='clay_leads_v2.xlsx',
                        help='Output Excel file')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                       help='Worker processes used when input_file is a directory')
     
     args = parser.parse_args()
     
     try:
         print("🚀 Enhanced Clay Lead Scraper v2")
-        print(f"📁 Processing: {args.input_file}")
-        
-        with open(args.input_file, 'r', encoding='utf-8', errors='ignore') as f:
-            html_content = f.read()
         
-        leads = extract_leads_from_clay_html(html_content)
+        if os.path.isdir(args.input_file):
+            snapshots = find_snapshots(args.input_file)
+            print(f"📂 Merging {len(snapshots)} snapshots from {args.input_file}")
+            leads = extract_snapshots(snapshots, args.workers)
+        else:
+            print(f"📁 Processing: {args.input_file}")
+            
+            with open(args.input_file, 'r', encoding='utf-8', errors='ignore') as f:
+                html_content = f.read()
+            
+            leads = extract_leads_from_clay_html(html_content)
         
         if leads:
             print(f"\n🎉 Successfully extracted {len(leads)} leads!")
@@ -5,12 +5,130 @@ This script extracts organization data from multiple Crunchbase search results H
 """
 
 import pandas as pd
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 import json
 import sys
 import os
 import glob
+import sqlite3
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "data_extractor"))
+from text_normalize import normalize_space
+
+STORE_FILE = 'crunchbase_orgs.db'
+EXPORT_FILE = 'crunchbase_orgs.xlsx'
+
+# The only elements extract_crunchbase_data reads; everything else is never built into the tree
+PARSED_ELEMENTS = SoupStrainer(['script', 'a'])
+# Matches organization profile links and captures their identifier
+ORGANIZATION_HREF_RE = re.compile(r'/organization/([^/?]+)')
+DIGITS_ONLY_RE = re.compile(r'^\d+$')
+HTML_FILE_NUMBER_RE = re.compile(r'crunchbase-(\d+)\.html')
+ALL_CAPS_SHORT_RE = re.compile(r'^[A-Z\s]{2,10}$')
+# Common UI elements and invalid names
+INVALID_NAME_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'^(search|filter|menu|login|sign up|get started|learn more|view all)$',
+    r'^\d+$',  # Pure numbers
+    r'^[A-Z\s]{1,3}$',  # Short all-caps
+    r'^(or|and|the|for|with|inc|llc|ltd)$',  # Common words
+]]
+JSON_DECODER = json.JSONDecoder()
+CONTAINER_TYPES = (dict, list)
+CLOSE_TOKEN = (None, None, True)
+
+def iter_json_values(script_content):
+    """Yield each JSON object embedded in a script body, decoding incrementally from every '{' that parses."""
+    pos = script_content.find('{')
+    while pos != -1:
+        try:
+            value, end = JSON_DECODER.raw_decode(script_content, pos)
+        except ValueError:
+            pos = script_content.find('{', pos + 1)
+            continue
+        yield value
+        pos = script_content.find('{', end)
+
+def json_tokens(value):
+    """Flatten a decoded JSON value into the tokens the old span regexes saw, in document order.
+    
+    Each token is (key, string, closes): a key with its string value (or None),
+    a bare string in a list, or an object's closing brace.
+    """
+    tokens = []
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if type(node) is tuple:
+            tokens.append(node)
+        elif isinstance(node, dict):
+            stack.append(CLOSE_TOKEN)
+            for key, child in reversed(node.items()):
+                if type(child) in CONTAINER_TYPES:
+                    stack.append(child)
+                stack.append((key, child if isinstance(child, str) else None, False))
+        elif isinstance(node, list):
+            for item in reversed(node):
+                if type(item) in CONTAINER_TYPES:
+                    stack.append(item)
+                elif isinstance(item, str):
+                    stack.append((None, item, False))
+    return tokens
+
+def next_index(tokens, test):
+    """For every position, the index of the first token at or after it that passes test (len(tokens) if none)."""
+    following = [len(tokens)] * (len(tokens) + 1)
+    for i in range(len(tokens) - 1, -1, -1):
+        following[i] = i if test(tokens[i]) else following[i + 1]
+    return following
+
+def keyed_string(key):
+    return lambda token: token[0] == key and bool(token[1])
+
+def iter_organizations(value):
+    """Match the old span regexes over a decoded JSON value, yielding organization records in their order.
+    
+    The regexes were "organization" ... "identifier" ... "value": "…" ... "name": "…" and
+    "name": "…" ... "permalink": "…", where each gap could open objects but not cross a '}'.
+    Here a gap may not cross a closing brace or a string containing one; nested
+    objects, and "organization" or "identifier" as a value rather than a key, match
+    just as they did. Identifier records come first, then name/permalink records.
+    """
+    tokens = json_tokens(value)
+    barrier = next_index(tokens, lambda token: token[2] or '}' in (token[0] or '') or '}' in (token[1] or ''))
+    
+    identifiers = next_index(tokens, lambda token: 'identifier' in (token[0], token[1]))
+    values = next_index(tokens, keyed_string('value'))
+    names = next_index(tokens, keyed_string('name'))
+    i = 0
+    while i < len(tokens):
+        key, string, _ = tokens[i]
+        if key == 'organization' and string == 'identifier':
+            identifier = i
+        elif (key == 'organization' and '}' not in (string or '')) or string == 'organization':
+            identifier = identifiers[i + 1]
+        else:
+            i += 1
+            continue
+        # The "value" and "name" tokens may contain a '}' themselves; it falls inside their capture
+        value_at = values[identifier + 1] if identifier < barrier[i + 1] else len(tokens)
+        name_at = names[value_at + 1] if value_at <= barrier[i + 1] and value_at < len(tokens) else len(tokens)
+        if name_at < len(tokens) and name_at <= barrier[value_at + 1]:
+            yield {'identifier': tokens[value_at][1], 'name': tokens[name_at][1]}
+            i = name_at + 1
+        else:
+            i += 1
+    
+    permalinks = next_index(tokens, keyed_string('permalink'))
+    i = names[0]
+    while i < len(tokens):
+        permalink = permalinks[i + 1]
+        if permalink < len(tokens) and permalink <= barrier[i + 1]:
+            yield {'name': tokens[i][1], 'permalink': tokens[permalink][1]}
+            i = names[permalink + 1]
+        else:
+            i = names[i + 1]
 
 def extract_crunchbase_data(html_file_path):
     """Extract organization data from Crunchbase HTML file"""
@@ -22,55 +140,73 @@ def extract_crunchbase_data(html_file_path):
         print(f"Error reading file {html_file_path}: {e}")
         return []
     
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'html.parser', parse_only=PARSED_ELEMENTS)
     organizations = []
     
-    # Method 1: Look for JSON data in script tags with specific patterns
+    # Method 1: Walk the JSON objects embedded in script tags for organization records
+    json_ld_orgs = []
     scripts = soup.find_all('script')
     for script in scripts:
-        if script.string:
-            script_content = script.string
-            
-            # Look for organization data in JSON structures
-            # Pattern 1: Look for organization objects with identifiers
-            org_pattern = r'"organization"[^}]*?"identifier"[^}]*?"value":\s*"([^"]+)"[^}]*?"name":\s*"([^"]+)"'
-            matches = re.findall(org_pattern, script_content)
-            
-            for identifier, name in matches:
-                if len(name) > 2 and not any(keyword in name.lower() for keyword in ['button', 'menu', 'search', 'filter', 'login']):
-                    organizations.append({
-                        'Name': name,
-                        'Identifier': identifier,
-                        'URL': f"https://www.crunchbase.com/organization/{identifier}"
-                    })
-            
-            # Pattern 2: Look for company data structures
-            company_pattern = r'"name":\s*"([^"]+)"[^}]*?"permalink":\s*"([^"]+)"'
-            matches = re.findall(company_pattern, script_content)
-            
-            for name, permalink in matches:
-                if (len(name) > 2 and 
-                    not any(keyword in name.lower() for keyword in ['search', 'filter', 'menu', 'button', 'crunchbase', 'login']) and
-                    not re.match(r'^[A-Z\s]{2,10}$', name)):  # Avoid all caps short strings
-                    
-                    organizations.append({
-                        'Name': name,
-                        'Identifier': permalink,
-                        'URL': f"https://www.crunchbase.com/organization/{permalink}"
+        if not script.string:
+            continue
+        script_content = script.string
+        
+        # Method 3 input: structured data (JSON-LD), gathered in the same pass
+        if script.get('type') == 'application/ld+json':
+            try:
+                data = json.loads(script_content)
+                if isinstance(data, dict) and 'name' in data:
+                    json_ld_orgs.append({
+                        'Name': data['name'],
+                        'URL': data.get('url', '')
                     })
+            except json.JSONDecodeError:
+                pass
+        
+        # Scripts without either key cannot hold an organization record
+        if '"identifier"' not in script_content and '"permalink"' not in script_content:
+            continue
+        
+        identified, named = [], []
+        for value in iter_json_values(script_content):
+            for org in iter_organizations(value):
+                (identified if 'identifier' in org else named).append(org)
+        
+        # Organization objects with identifiers
+        for org in identified:
+            name = org['name']
+            if len(name) > 2 and not any(keyword in name.lower() for keyword in ['button', 'menu', 'search', 'filter', 'login']):
+                organizations.append({
+                    'Name': name,
+                    'Identifier': org['identifier'],
+                    'URL': f"https://www.crunchbase.com/organization/{org['identifier']}"
+                })
+        
+        # Company data structures
+        for org in named:
+            name = org['name']
+            if (len(name) > 2 and 
+                not any(keyword in name.lower() for keyword in ['search', 'filter', 'menu', 'button', 'crunchbase', 'login']) and
+                not ALL_CAPS_SHORT_RE.match(name)):  # Avoid all caps short strings
+                
+                organizations.append({
+                    'Name': name,
+                    'Identifier': org['permalink'],
+                    'URL': f"https://www.crunchbase.com/organization/{org['permalink']}"
+                })
     
     # Method 2: Look for organization links in HTML
-    org_links = soup.find_all('a', href=re.compile(r'/organization/'))
+    org_links = soup.find_all('a', href=ORGANIZATION_HREF_RE)
     for link in org_links:
         href = link.get('href', '')
         text = link.get_text(strip=True)
         
         if (text and len(text) > 2 and 
             not any(keyword in text.lower() for keyword in ['view', 'more', 'see', 'all', 'profile', 'about']) and
-            not re.match(r'^\d+$', text)):  # Avoid pure numbers
+            not DIGITS_ONLY_RE.match(text)):  # Avoid pure numbers
             
             # Extract organization identifier from URL
-            org_match = re.search(r'/organization/([^/?]+)', href)
+            org_match = ORGANIZATION_HREF_RE.search(href)
             if org_match:
                 identifier = org_match.group(1)
                 organizations.append({
@@ -79,42 +215,32 @@ def extract_crunchbase_data(html_file_path):
                     'URL': f"https://www.crunchbase.com{href}" if href.startswith('/') else href
                 })
     
-    # Method 3: Look for structured data (JSON-LD)
-    json_ld_scripts = soup.find_all('script', type='application/ld+json')
-    for script in json_ld_scripts:
-        try:
-            data = json.loads(script.string)
-            if isinstance(data, dict) and 'name' in data:
-                organizations.append({
-                    'Name': data['name'],
-                    'URL': data.get('url', '')
-                })
-        except (json.JSONDecodeError, AttributeError):
-            continue
+    # Method 3: Structured data (JSON-LD) found during the script pass
+    organizations.extend(json_ld_orgs)
     
-    # Remove duplicates and filter out invalid entries
-    seen_names = set()
+    # Remove duplicates (by identifier, or by name when there is none) and filter out invalid entries
+    seen_keys = set()
     filtered_orgs = []
+    # A record without an identifier is the same org as an identified one of that name
+    identified_names = {normalize_space(org.get('Name', '')).lower()
+                        for org in organizations if str(org.get('Identifier') or '').strip()}
     
     for org in organizations:
-        name = org.get('Name', '').strip()
+        name = normalize_space(org.get('Name', ''))
+        org['Name'] = name
+        key = org_key(org)
         
         # Skip if empty or already seen
-        if not name or name.lower() in seen_names:
+        if not name or key in seen_keys:
+            continue
+        if key.startswith('name:') and name.lower() in identified_names:
             continue
             
         # Skip common UI elements and invalid names
-        invalid_patterns = [
-            r'^(search|filter|menu|login|sign up|get started|learn more|view all)$',
-            r'^\d+$',  # Pure numbers
-            r'^[A-Z\s]{1,3}$',  # Short all-caps
-            r'^(or|and|the|for|with|inc|llc|ltd)$',  # Common words
-        ]
-        
-        if any(re.match(pattern, name, re.IGNORECASE) for pattern in invalid_patterns):
+        if any(pattern.match(name) for pattern in INVALID_NAME_PATTERNS):
             continue
             
-        seen_names.add(name.lower())
+        seen_keys.add(key)
         filtered_orgs.append(org)
     
     return filtered_orgs
@@ -130,27 +256,96 @@ def load_existing_data(excel_file):
             print(f"Error reading existing Excel file: {e}")
             return pd.DataFrame()
     else:
-        print(f"Excel file {excel_file} doesn't exist. Will create new file.")
+        print(f"Excel file {excel_file} doesn't exist. Starting with an empty store.")
         return pd.DataFrame()
 
-def save_to_excel(all_organizations, output_file='crunchbase_orgs.xlsx'):
-    """Save organization data to Excel file"""
-    if not all_organizations:
-        print("No organizations found.")
-        return
+def org_key(org):
+    """Dedup key of an organization: its Crunchbase identifier/permalink, or its normalized name without one"""
+    identifier = str(org.get('Identifier') or '').strip().lower()
+    if identifier:
+        return f"id:{identifier}"
+    return f"name:{normalize_space(str(org.get('Name') or '')).lower()}"
+
+def open_store(db_file=STORE_FILE, seed_excel=EXPORT_FILE):
+    """Open the organization store, creating it and seeding it once from an existing Excel file"""
+    conn = sqlite3.connect(db_file)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS organizations (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            name_key TEXT NOT NULL,
+            identifier TEXT NOT NULL DEFAULT '',
+            url TEXT NOT NULL DEFAULT '',
+            org_key TEXT
+        );
+    """)
     
-    df = pd.DataFrame(all_organizations)
+    # Stores written before dedup moved to identifiers keyed on the name instead
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(organizations)')}
+    if 'org_key' not in columns:
+        with conn:
+            conn.execute('ALTER TABLE organizations ADD COLUMN org_key TEXT')
+            conn.execute("UPDATE organizations SET org_key = CASE WHEN identifier <> '' "
+                         "THEN 'id:' || lower(trim(identifier)) ELSE 'name:' || name_key END")
+            conn.execute('DELETE FROM organizations WHERE id NOT IN '
+                         '(SELECT MIN(id) FROM organizations GROUP BY org_key)')
+    conn.executescript("""
+        DROP INDEX IF EXISTS organizations_identifier;
+        DROP INDEX IF EXISTS organizations_name_key;
+        CREATE UNIQUE INDEX IF NOT EXISTS organizations_org_key ON organizations (org_key);
+        CREATE INDEX IF NOT EXISTS organizations_name ON organizations (name_key);
+    """)
+    
+    if conn.execute('SELECT 1 FROM organizations LIMIT 1').fetchone() is None:
+        existing_df = load_existing_data(seed_excel)
+        if not existing_df.empty:
+            added = upsert_organizations(conn, existing_df.fillna('').to_dict('records'))
+            print(f"Seeded store with {added} organizations from {seed_excel}")
+    
+    return conn
+
+def upsert_organizations(conn, organizations):
+    """Insert organizations whose identifier (or name, without one) is not stored yet; return how many were added
     
-    # Ensure required columns exist
-    required_columns = ['Name', 'Identifier', 'URL']
-    for col in required_columns:
-        if col not in df.columns:
-            df[col] = ''
+    A record without an identifier is skipped when any organization of the same
+    name is stored or arrives in the same batch with an identifier. A record with
+    one takes over a stored name-only row of the same name instead of adding a second.
+    """
+    rows = []
+    for org in organizations:
+        name = normalize_space(str(org.get('Name') or ''))
+        if name:
+            identifier = str(org.get('Identifier') or '').strip()
+            rows.append((name, name.lower(), identifier, str(org.get('URL') or ''), org_key(org)))
+    identified_names = {row[1] for row in rows if row[2]}
+    rows = [row for row in rows if row[2] or row[1] not in identified_names]
+    identified = [row for row in rows if row[2]]
     
-    # Remove duplicates based on Name (case-insensitive)
-    df['Name_lower'] = df['Name'].str.lower()
-    df = df.drop_duplicates(subset=['Name_lower'], keep='first')
-    df = df.drop(columns=['Name_lower'])
+    with conn:
+        # Upgrade in place so the organization keeps its position in the export
+        conn.executemany('UPDATE organizations SET identifier = ?, url = ?, org_key = ? '
+                         'WHERE org_key = \'name:\' || ? '
+                         'AND NOT EXISTS (SELECT 1 FROM organizations WHERE org_key = ?)',
+                         [(identifier, url, key, name_key, key) for _, name_key, identifier, url, key in identified])
+        conn.executemany('DELETE FROM organizations WHERE org_key = \'name:\' || ? '
+                         'AND EXISTS (SELECT 1 FROM organizations WHERE org_key = ?)',
+                         [(name_key, key) for _, name_key, _, _, key in identified])
+        # The first record stored under a key wins, as with the Excel history
+        insert = ('INSERT INTO organizations (name, name_key, identifier, url, org_key) '
+                  'SELECT ?, ?, ?, ?, ? '
+                  'WHERE ? <> \'\' OR NOT EXISTS (SELECT 1 FROM organizations WHERE name_key = ?) '
+                  'ON CONFLICT DO NOTHING')
+        added = conn.executemany(insert, [(*row, row[2], row[1]) for row in rows]).rowcount
+    return added
+
+def save_to_excel(conn, output_file=EXPORT_FILE):
+    """Export the whole organization store to an Excel file"""
+    df = pd.read_sql_query(
+        'SELECT name AS Name, identifier AS Identifier, url AS URL FROM organizations ORDER BY id', conn
+    )
+    if df.empty:
+        print("No organizations found.")
+        return
     
     try:
         df.to_excel(output_file, index=False, engine='openpyxl')
@@ -165,32 +360,30 @@ def find_html_files():
     
     # Sort by number for consistent processing order
     def get_number(filename):
-        match = re.search(r'crunchbase-(\d+)\.html', filename)
+        match = HTML_FILE_NUMBER_RE.search(filename)
         return int(match.group(1)) if match else 0
     
     files.sort(key=get_number)
     return files
 
 def main():
-    output_file = 'crunchbase_orgs.xlsx'
+    parser = argparse.ArgumentParser(description='Extract organizations from crunchbase-*.html search pages')
+    parser.add_argument('--db', default=STORE_FILE, help=f'Organization store to merge into (default: {STORE_FILE})')
+    parser.add_argument('--export', nargs='?', const=EXPORT_FILE, metavar='XLSX',
+                        help=f'Also write the whole store to XLSX (default: {EXPORT_FILE})')
+    args = parser.parse_args()
+    
+    conn = open_store(args.db)
     
     # Find all HTML files matching the pattern
     html_files = find_html_files()
     
     if not html_files:
         print("No crunchbase-*.html files found in current directory.")
-        return
-    
-    print(f"Found {len(html_files)} HTML files to process:")
-    for file in html_files:
-        print(f"  - {file}")
-    
-    # Load existing data from Excel file
-    existing_df = load_existing_data(output_file)
-    existing_names = set()
-    
-    if not existing_df.empty:
-        existing_names = set(existing_df['Name'].str.lower())
+    else:
+        print(f"Found {len(html_files)} HTML files to process:")
+        for file in html_files:
+            print(f"  - {file}")
     
     # Process all HTML files
     all_new_organizations = []
@@ -205,31 +398,18 @@ def main():
         else:
             print(f"  No organizations found in {html_file}")
     
-    if not all_new_organizations:
+    if all_new_organizations:
+        added = upsert_organizations(conn, all_new_organizations)
+        print(f"\nFound {len(all_new_organizations)} total organizations")
+        print(f"Found {added} new organizations (after removing duplicates)")
+    elif html_files:
         print("\nNo new organizations found in any files.")
-        return
-    
-    # Filter out organizations that already exist (case-insensitive)
-    new_organizations = []
-    for org in all_new_organizations:
-        if org['Name'].lower() not in existing_names:
-            new_organizations.append(org)
     
-    print(f"\nFound {len(all_new_organizations)} total organizations")
-    print(f"Found {len(new_organizations)} new organizations (after removing duplicates)")
+    if args.export:
+        save_to_excel(conn, args.export)
+        print(f"\n✅ Processing complete! Check {args.export}")
     
-    # Combine existing and new data
-    if not existing_df.empty:
-        combined_organizations = existing_df.to_dict('records') + new_organizations
-    else:
-        combined_organizations = new_organizations
-    
-    # Save to Excel
-    if combined_organizations:
-        save_to_excel(combined_organizations, output_file)
-        print(f"\n✅ Processing complete! Check {output_file}")
-    else:
-        print("\nNo new data to add.")
+    conn.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,42 +2,713 @@
 
 import os
 import re
+import json
+import time
+import logging
+from bisect import bisect_left
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import Process
 import pandas as pd
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
 import argparse
 import subprocess
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from public_suffix import registrable_domain
+from spool import claim_spool_files, requeue_orphaned_claims, worker_claim_dir
+from text_normalize import clean_field, normalize_space
+
+class SpanMatch:
+    """Stand-in for the re.Match of a linear-time matcher's search; only group(1) is reproduced."""
+    
+    def __init__(self, first_group: str):
+        self.first_group = first_group
+    
+    def group(self, index: int = 1) -> str:
+        if index != 1:
+            raise IndexError('only group(1) is available')
+        return self.first_group
+
+
+class LinearMatcher:
+    """Hand-written equivalent of a regex that backtracks super-linearly on long letter runs.
+    
+    Subclasses reproduce the original pattern's findall/search results exactly while
+    touching each character a bounded number of times. `pattern` keeps the original
+    regex text for reporting.
+    """
+    
+    pattern = ''
+    
+    @staticmethod
+    def _positions(regex: 're.Pattern', text: str) -> List[int]:
+        return [match.start() for match in regex.finditer(text)]
+    
+    @staticmethod
+    def _first_at_or_after(positions: List[int], position: int) -> Optional[int]:
+        index = bisect_left(positions, position)
+        return positions[index] if index < len(positions) else None
+
+
+# Letter followed by one or more letters/whitespace: the run every name-like group lives in
+NAME_RUN_RE = re.compile(r'[A-Z][a-zA-Z\s]+', re.IGNORECASE)
+ORG_RUN_RE = re.compile(r'[A-Z][A-Za-z\s&]+', re.IGNORECASE)
+NEWLINE_RE = re.compile(r'\n')
+
+
+class CoFounderSuffixMatcher(LinearMatcher):
+    """`([A-Z][a-zA-Z\\s]+?):\\s*Co-Founder` (IGNORECASE | MULTILINE).
+    
+    ':' is outside the name class, so the lazy group can only stop where its run ends;
+    every start inside a run therefore succeeds or fails together.
+    """
+    
+    pattern = r'([A-Z][a-zA-Z\s]+?):\s*Co-Founder'
+    TAIL_RE = re.compile(r':\s*Co-Founder', re.IGNORECASE)
+    
+    def findall(self, text: str) -> List[str]:
+        results = []
+        position = 0
+        while True:
+            run = NAME_RUN_RE.search(text, position)
+            if not run:
+                return results
+            tail = self.TAIL_RE.match(text, run.end())
+            if tail:
+                results.append(run.group())
+                position = tail.end()
+            else:
+                position = run.end()
+
+
+class AndFounderMatcher(LinearMatcher):
+    """`([A-Z][a-zA-Z\\s]+?)\\s+and\\s+([A-Z][a-zA-Z\\s]+?).*?(?:co-)?founder` (IGNORECASE | MULTILINE).
+    
+    `.*?` cannot cross a newline but the second group can, so a separator works iff the
+    first "founder" after it is not separated from the run's end by a newline. That only
+    gets harder further along the run, so the lazy first group either takes the first
+    separator or the whole run fails. The second group is two characters, or stretches
+    to the line the founder is on.
+    """
+    
+    pattern = r'([A-Z][a-zA-Z\s]+?)\s+and\s+([A-Z][a-zA-Z\s]+?).*?(?:co-)?founder'
+    SEPARATOR_RE = re.compile(r'\s+and\s+[A-Z][a-zA-Z\s]', re.IGNORECASE)
+    FOUNDER_RE = re.compile(r'founder', re.IGNORECASE)
+    
+    def findall(self, text: str) -> List[Tuple[str, str]]:
+        founders = self._positions(self.FOUNDER_RE, text)
+        newlines = self._positions(NEWLINE_RE, text)
+        results = []
+        position = 0
+        while True:
+            run = NAME_RUN_RE.search(text, position)
+            if not run:
+                return results
+            start, run_end = run.start(), run.end()
+            position = run_end
+            separator = self.SEPARATOR_RE.search(text, start + 2, run_end)
+            if not separator:
+                continue
+            second = separator.end() - 2
+            founder = self._first_at_or_after(founders, second + 2)
+            if founder is None:
+                continue
+            newline_after_run = self._first_at_or_after(newlines, run_end)
+            if newline_after_run is not None and newline_after_run < founder:
+                continue
+            second_end = second + 2
+            last_newline = bisect_left(newlines, founder) - 1
+            if last_newline >= 0 and newlines[last_newline] >= second_end:
+                second_end = newlines[last_newline] + 1
+            results.append((text[start:separator.start()], text[second:second_end]))
+            position = founder + len('founder')
+
+
+class AndInvestorMatcher(LinearMatcher):
+    """`([A-Z][A-Za-z\\s&]+)\\s+and\\s+([A-Z][A-Za-z\\s&]+).*?investor` (IGNORECASE), search only.
+    
+    A separator works iff the first "investor" after its second group's first two
+    characters is not separated from the run's end by a newline. That only gets harder
+    further along the run, so the greedy first group ends at the last separator of the
+    working prefix, and a failed run is skipped whole.
+    """
+    
+    pattern = r'([A-Z][A-Za-z\s&]+)\s+and\s+([A-Z][A-Za-z\s&]+).*?investor'
+    SEPARATOR_RE = re.compile(r'\s+(and)\s+[A-Z][A-Za-z\s&]', re.IGNORECASE)
+    INVESTOR_RE = re.compile(r'investor', re.IGNORECASE)
+    
+    def search(self, text: str) -> Optional[SpanMatch]:
+        investors = self._positions(self.INVESTOR_RE, text)
+        newlines = self._positions(NEWLINE_RE, text)
+        position = 0
+        while True:
+            run = ORG_RUN_RE.search(text, position)
+            if not run:
+                return None
+            start, run_end = run.start(), run.end()
+            position = run_end
+            newline_after_run = self._first_at_or_after(newlines, run_end)
+            best = None
+            search_from = start + 2
+            while True:
+                separator = self.SEPARATOR_RE.search(text, search_from, run_end)
+                if not separator:
+                    break
+                investor = self._first_at_or_after(investors, separator.end())
+                if investor is None or (newline_after_run is not None and newline_after_run < investor):
+                    break
+                # Greedy first group keeps all but the last whitespace before "and"
+                best = separator.start(1) - 1
+                search_from = separator.start(1) + 1
+            if best:
+                return SpanMatch(text[start:best])
+
+
+class DollarItSpendMatcher(LinearMatcher):
+    """`(\\$[0-9,]+[MKB]?)\\s*.*?IT.*?spend` (IGNORECASE).
+    
+    An amount matches iff the line where its trailing whitespace ends has an "it"
+    followed later on that line by "spend"; precomputed offsets answer that by bisect.
+    """
+    
+    pattern = r'(\$[0-9,]+[MKB]?)\s*.*?IT.*?spend'
+    AMOUNT_RE = re.compile(r'(\$[0-9,]+[MKB]?)\s*', re.IGNORECASE)
+    IT_RE = re.compile(r'it', re.IGNORECASE)
+    SPEND_RE = re.compile(r'spend', re.IGNORECASE)
+    
+    def findall(self, text: str) -> List[str]:
+        its = self._positions(self.IT_RE, text)
+        spends = self._positions(self.SPEND_RE, text)
+        newlines = self._positions(NEWLINE_RE, text)
+        results = []
+        position = 0
+        while True:
+            amount = self.AMOUNT_RE.search(text, position)
+            if not amount:
+                return results
+            position = amount.start() + 1
+            line_end = self._first_at_or_after(newlines, amount.end())
+            line_end = len(text) if line_end is None else line_end
+            it = self._first_at_or_after(its, amount.end())
+            if it is None or it >= line_end:
+                continue
+            spend = self._first_at_or_after(spends, it + 2)
+            if spend is None or spend >= line_end:
+                continue
+            results.append(amount.group(1))
+            position = spend + len('spend')
+
+
+class CityRegionCountryMatcher(LinearMatcher):
+    """`([A-Z][a-zA-Z\\s]+,\\s*[A-Z][a-zA-Z\\s]+,\\s*[A-Z][a-zA-Z\\s]+)(?:\\.|$)` (IGNORECASE).
+    
+    Commas sit outside the segment class, so each greedy segment must span its whole
+    run; a start fails or succeeds together with the rest of its run.
+    """
+    
+    pattern = r'([A-Z][a-zA-Z\s]+,\s*[A-Z][a-zA-Z\s]+,\s*[A-Z][a-zA-Z\s]+)(?:\.|$)'
+    SEPARATOR_RE = re.compile(r',\s*')
+    
+    def _segment_after(self, text: str, position: int):
+        separator = self.SEPARATOR_RE.match(text, position)
+        return NAME_RUN_RE.match(text, separator.end()) if separator else None
+    
+    def findall(self, text: str) -> List[str]:
+        results = []
+        position = 0
+        while True:
+            first = NAME_RUN_RE.search(text, position)
+            if not first:
+                return results
+            position = first.end()
+            second = self._segment_after(text, first.end())
+            third = self._segment_after(text, second.end()) if second else None
+            if not third:
+                continue
+            end = third.end()
+            if end < len(text) and text[end] == '.':
+                results.append(text[first.start():end])
+                position = end + 1
+            elif end == len(text):
+                results.append(text[first.start():end])
+                position = end
+
+
+class AboutParagraphMatcher(LinearMatcher):
+    """`About.*?\\n([^.]{50,400}\\.)` (IGNORECASE | DOTALL), search only.
+    
+    Later "About"s only see a suffix of the newlines the first one sees, so the
+    answer is the first qualifying paragraph after the first "About".
+    """
+    
+    pattern = r'About.*?\n([^.]{50,400}\.)'
+    ABOUT_RE = re.compile(r'About', re.IGNORECASE)
+    PARAGRAPH_RE = re.compile(r'\n([^.]{50,400}\.)')
+    
+    def search(self, text: str):
+        about = self.ABOUT_RE.search(text)
+        return self.PARAGRAPH_RE.search(text, about.end()) if about else None
+
+
+# Every field pattern, grouped by the extractor that uses it and tried in list order.
+# Patterns that backtrack super-linearly on long text are replaced by their LinearMatcher.
+PATTERN_SPECS = {
+    'title_name': [
+        (r'^([^-]+?)\s*-\s*Crunchbase', 0),
+    ],
+    'name': [
+        (r'^([A-Z][A-Za-z0-9\s&.-]{1,49})\s+(?:is a|provides|offers)', 0),
+        (r'About\s+([A-Z][A-Za-z0-9\s&.-]{1,49})\s+', 0),
+        (r'([A-Z][A-Za-z0-9\s&.-]{1,49})\s+-\s+Crunchbase', 0),
+    ],
+    'founders': [
+        (CoFounderSuffixMatcher(), re.IGNORECASE | re.MULTILINE),
+        (r'Co-Founder[^A-Z]*([A-Z][a-zA-Z\s]+?)(?:\s|$|\n)', re.IGNORECASE | re.MULTILINE),
+        (r'Founded by\s+([A-Z][a-zA-Z\s]+?)(?:\s+and\s+([A-Z][a-zA-Z\s]+?))?', re.IGNORECASE | re.MULTILINE),
+        (r'Founder[s]?:\s*([A-Z][a-zA-Z\s]+?)(?:\n|$|,)', re.IGNORECASE | re.MULTILINE),
+        (r'Key People\s+([A-Z][a-zA-Z\s]+?):\s*(?:Co-)?Founder', re.IGNORECASE | re.MULTILINE),
+        (AndFounderMatcher(), re.IGNORECASE | re.MULTILINE),
+    ],
+    'about': [
+        (r'(?:is a|provides|offers)\s+([^.]{50,400}\.)', re.IGNORECASE | re.DOTALL),
+        (AboutParagraphMatcher(), re.IGNORECASE | re.DOTALL),
+        (r'Description[:\s]+([^.]{50,400}\.)', re.IGNORECASE | re.DOTALL),
+        (r'([A-Z][^.]{100,400}\.)\s*(?:The company|Founded|Headquartered)', re.IGNORECASE | re.DOTALL),
+    ],
+    'phone': [
+        (r'Phone\s+Number\s+([0-9\-\(\)\+\s]{10,20})', re.IGNORECASE),
+        (r'Contact.*?(?:Phone|Tel)[:\s]+([0-9\-\(\)\+\s]{10,20})', re.IGNORECASE),
+        (r'(\+?1[-.\s]?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4})', re.IGNORECASE),
+        (r'([0-9]{3}[-.\s]?[0-9]{3}[-.\s]?[0-9]{4})', re.IGNORECASE),
+    ],
+    'email': [
+        (r'Contact\s+Email\s+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', re.IGNORECASE),
+        (r'Email[:\s]+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', re.IGNORECASE),
+        (r'\b([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b', re.IGNORECASE),
+    ],
+    'investors': [
+        (r'investors?\s+including\s+([A-Z][^.]{10,150})', re.IGNORECASE),
+        (r'funded\s+by\s+([A-Z][^.]{10,150})', re.IGNORECASE),
+        (r'backed\s+by\s+([A-Z][^.]{10,150})', re.IGNORECASE),
+        (AndInvestorMatcher(), re.IGNORECASE),
+    ],
+    'headcount': [
+        (r'Headcount\s+([0-9,\-\s]+)', re.IGNORECASE),
+        (r'([0-9,]+\s*-\s*[0-9,]+)\s*employees?', re.IGNORECASE),
+        (r'employee[s]?\s*[:\s]+([0-9,\-\s]+)', re.IGNORECASE),
+        (r'([0-9]{2,})\s*-\s*([0-9]{3,})\s*(?:people|employees?)', re.IGNORECASE),
+    ],
+    'visits': [
+        (r'Monthly\s+Web\s+Visits[:\s\n]+([0-9,]+)', re.IGNORECASE),
+        (r'([0-9,]{6,})\s*monthly.*?visits', re.IGNORECASE),
+        (r'visits[:\s]+([0-9,]{6,})', re.IGNORECASE),
+    ],
+    'it_spend': [
+        (r'IT\s+Spend[:\s\n]+(\$[0-9,MKB]+)', re.IGNORECASE),
+        (r'projected\s+to\s+spend\s+(\$[0-9,MKB]+).*?IT', re.IGNORECASE),
+        (DollarItSpendMatcher(), re.IGNORECASE),
+    ],
+    'ip': [
+        (r'Total\s+IP[:\s\n]+([0-9,]+)', re.IGNORECASE),
+        (r'intellectual\s+property.*?includes\s+([0-9,]+)', re.IGNORECASE),
+        (r'([0-9,]+)\s*(?:registered\s+)?patents?', re.IGNORECASE),
+        (r'([0-9,]+)\s*(?:registered\s+)?trademarks?', re.IGNORECASE),
+    ],
+    'products': [
+        (r'uses\s+([0-9,]+)\s*technology\s+products?.*?including\s+([^.]{20,200})', re.IGNORECASE),
+        (r'technology.*?including\s+([^.]{20,200})', re.IGNORECASE),
+        (r'powered\s+by\s+([^.]{20,200})', re.IGNORECASE),
+    ],
+    'location': [
+        (r'(?:located|headquartered)\s+in\s+([A-Z][^.]{10,100})', re.IGNORECASE),
+        (r'(?:headquarters|HQ)[:\s]+([A-Z][^.]{10,100})', re.IGNORECASE),
+        (CityRegionCountryMatcher(), re.IGNORECASE),
+        (r'based\s+in\s+([A-Z][^.]{10,100})', re.IGNORECASE),
+    ],
+    'text_domain': [
+        (r'(?:www\.)?([a-zA-Z0-9.-]+\.(?:com|org|net|io))', re.IGNORECASE),
+        (r'visit\s+(?:www\.)?([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', re.IGNORECASE),
+        (r'website[:\s]+(?:www\.)?([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})', re.IGNORECASE),
+    ],
+}
+
+# Anchor keyword per field group and how many characters before/after each hit its patterns
+# need to see. One combined scan locates every anchor; patterns then only run on those windows.
+FIELD_ANCHORS = {
+    'founders': (r'found', 300, 120),
+    'phone': (r'phone|tel', 300, 60),
+    'email': (r'@', 100, 100),
+    'investors': (r'investor|funded|backed', 300, 200),
+    'headcount': (r'headcount|employee|people', 60, 60),
+    'visits': (r'visits', 300, 60),
+    'it_spend': (r'spend', 300, 300),
+    'ip': (r'total\s+ip|intellectual|patent|trademark', 60, 300),
+    'products': (r'technology|powered', 60, 600),
+    'location': (r'located|headquarter|hq|based\s+in', 0, 130),
+    'text_domain': (r'\.(?:com|org|net|io)|visit|website', 60, 80),
+}
+ANCHOR_RE = re.compile(
+    '|'.join(f'(?P<{group}>{anchor})' for group, (anchor, _, _) in FIELD_ANCHORS.items()),
+    re.IGNORECASE,
+)
+# Generic patterns with no keyword to anchor on; they still scan the whole text
+FULL_TEXT_PATTERNS = {'phone[2]', 'phone[3]', 'location[2]'}
+
+# Elements whose text never renders: inline JS bundles, JSON state, CSS and no-JS fallbacks
+NON_VISIBLE_TAGS = frozenset(['script', 'style', 'noscript', 'template'])
+VISIBLE_STRING_TYPES = (NavigableString, CData)
+# Heading keywords that mark the page sections field extractors can be scoped to
+SECTION_HEADINGS = {
+    'about': ('about', 'overview'),
+    'contact': ('contact',),
+    'financials': ('financial', 'funding', 'investor', 'technology', 'headcount',
+                   'intellectual property', 'web traffic'),
+}
+# Sections each field extractor reads when scoped, in preference order
+FIELD_SECTIONS = {
+    'founders': ('profile', 'about'),
+    'contact': ('contact',),
+    'financials': ('financials',),
+    'location': ('profile', 'about'),
+}
+
+# Angular's server-rendered application state; older builds escape it with &q;-style entities
+APP_STATE_RE = re.compile(
+    r'<script\b[^>]*\bid=["\'](?:ng-state|client-app-state)["\'][^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE)
+APP_STATE_ESCAPES = {'&q;': '"', '&s;': "'", '&l;': '<', '&g;': '>', '&a;': '&'}
+APP_STATE_ESCAPE_RE = re.compile('|'.join(APP_STATE_ESCAPES))
+# num_employees_enum values look like c_00011_00050 or c_10001_max
+HEADCOUNT_ENUM_RE = re.compile(r'c_0*(\d+)_(?:0*(\d+)|max)')
+LOCATION_ORDER = {'city': 0, 'region': 1, 'country': 2}
+
+# Registrable domain -> what a link to it is; domains not listed are candidate company sites
+LINK_HOST_KINDS = {
+    'crunchbase.com': 'ignore',
+    'facebook.com': 'facebook',
+    'linkedin.com': 'linkedin',
+    'twitter.com': 'social',
+    'instagram.com': 'social',
+    'youtube.com': 'social',
+    'google.com': 'social',
+}
+NON_COMPANY_SUFFIXES = ('.gov', '.edu')
+
+
+NON_DIGIT_RE = re.compile(r'[^\d]')
+
+
+logger = logging.getLogger(__name__)
+
+
+def visible_text(root: Tag) -> str:
+    """Concatenate root's rendered text, skipping script/style/noscript/template subtrees."""
+    parts = []
+    stack = [iter(root.children)]
+    while stack:
+        for child in stack[-1]:
+            if isinstance(child, Tag):
+                if child.name not in NON_VISIBLE_TAGS:
+                    stack.append(iter(child.children))
+                    break
+            elif type(child) in VISIBLE_STRING_TYPES:
+                parts.append(child)
+        else:
+            stack.pop()
+    return ''.join(parts)
+
+
+def page_sections(soup: BeautifulSoup) -> Dict[str, str]:
+    """Visible text of the profile header and the about/contact/financials sections."""
+    sections = {}
+    for heading in soup.find_all(['h1', 'h2', 'h3', 'h4']):
+        if heading.name == 'h1':
+            key = 'profile'
+        else:
+            heading_text = heading.get_text(' ', strip=True).lower()
+            key = next((name for name, words in SECTION_HEADINGS.items()
+                        if any(word in heading_text for word in words)), None)
+        if key is None:
+            continue
+        container = heading.find_parent('section') or heading.parent
+        if container is None or container.name in ('body', 'html', '[document]'):
+            continue
+        sections[key] = f"{sections[key]}\n{visible_text(container)}" if key in sections else visible_text(container)
+    return sections
+
+
+def load_app_state(html: str) -> Optional[dict]:
+    """Decode the page's embedded application-state JSON, or None when absent or malformed."""
+    match = APP_STATE_RE.search(html)
+    if not match:
+        return None
+    payload = match.group(1).strip()
+    if payload.startswith('{&q;'):
+        payload = APP_STATE_ESCAPE_RE.sub(lambda m: APP_STATE_ESCAPES[m.group(0)], payload)
+    try:
+        state = json.loads(payload)
+    except ValueError:
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def find_profile_entity(state: dict) -> Optional[dict]:
+    """First object in the state carrying an organization's properties and cards."""
+    stack = [state]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get('properties'), dict) and isinstance(node.get('cards'), dict):
+                return node
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return None
+
+
+def identifier_value(field) -> str:
+    """Display value of an entity identifier or {value: ...} wrapper."""
+    if isinstance(field, dict):
+        field = field.get('value')
+    return normalize_space(field) if isinstance(field, str) else ''
+
+
+@lru_cache(maxsize=16384)
+def classify_link(href: str) -> Tuple[str, str]:
+    """Field an anchor's href fills ('' for none) and the value it contributes."""
+    if '//' not in href[:8]:
+        return '', ''  # relative link, mailto: or javascript:
+    try:
+        parts = urlsplit(href)
+        host = parts.hostname
+    except ValueError:
+        return '', ''
+    if not host:
+        return '', ''
+    domain = registrable_domain(host)
+    kind = LINK_HOST_KINDS.get(domain)
+    if kind == 'facebook':
+        if '/pages/' in href or len(href.split('/')) >= 4:
+            return 'Facebook link', href
+    elif kind == 'linkedin':
+        if parts.path.lower().startswith('/company'):
+            return 'LinkedIn Link', href
+    elif kind is None and parts.scheme.lower() in ('http', 'https'):
+        if '.' in domain and len(domain) <= 50 and not domain.endswith(NON_COMPANY_SUFFIXES):
+            return 'Company domain link', domain
+    return '', ''
+
+
+def fill_missing(data: Dict[str, str], values: Dict[str, str]):
+    """Copy values into data for fields that are still empty."""
+    for field, value in values.items():
+        if value and not data.get(field):
+            data[field] = value
+
+
+class ExtractionTimeout(Exception):
+    """Raised when a file's extraction runs past its CPU time budget."""
+
+
+class TimeBudget:
+    """Per-file CPU time allowance, checked before every pattern call."""
+    
+    def __init__(self):
+        self.deadline = None
+    
+    def start(self, seconds: Optional[float]) -> None:
+        self.deadline = time.process_time() + seconds if seconds else None
+    
+    def check(self) -> None:
+        if self.deadline is not None and time.process_time() > self.deadline:
+            raise ExtractionTimeout()
+
+
+class TrackedPattern:
+    """Compiled pattern that counts its calls, matches and cumulative search time."""
+    
+    def __init__(self, group: str, index: int, pattern, flags: int = 0, budget: Optional[TimeBudget] = None):
+        self.budget = budget or TimeBudget()
+        self.group = group
+        self.key = f'{group}[{index}]'
+        self.regex = pattern if isinstance(pattern, LinearMatcher) else re.compile(pattern, flags)
+        self.calls = 0
+        self.hits = 0
+        self.matches = 0
+        self.seconds = 0.0
+    
+    def _record(self, started: float, found: int) -> None:
+        self.seconds += time.perf_counter() - started
+        self.calls += 1
+        self.matches += found
+        if found:
+            self.hits += 1
+    
+    def findall(self, text: str) -> list:
+        self.budget.check()
+        started = time.perf_counter()
+        result = self.regex.findall(text)
+        self._record(started, len(result))
+        return result
+    
+    def search(self, text: str):
+        self.budget.check()
+        started = time.perf_counter()
+        result = self.regex.search(text)
+        self._record(started, 1 if result else 0)
+        return result
+    
+    def findall_in(self, regions: List[str]) -> list:
+        """findall over each region in order, as one call."""
+        started = time.perf_counter()
+        result = []
+        for region in regions:
+            self.budget.check()
+            result.extend(self.regex.findall(region))
+        self._record(started, len(result))
+        return result
+    
+    def search_in(self, regions: List[str]):
+        """First match in the first region that has one."""
+        started = time.perf_counter()
+        result = None
+        for region in regions:
+            self.budget.check()
+            result = self.regex.search(region)
+            if result:
+                break
+        self._record(started, 1 if result else 0)
+        return result
+
+
+class AnchorScan:
+    """Single pass over page text recording where each field group's anchor keywords occur."""
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.hits = {group: [] for group in FIELD_ANCHORS}
+        for match in ANCHOR_RE.finditer(text):
+            self.hits[match.lastgroup].append(match.start())
+        self._windows = {}
+    
+    def windows(self, group: str) -> List[str]:
+        """Merged text windows around the group's anchor hits, in document order."""
+        if group not in self._windows:
+            _, before, after = FIELD_ANCHORS[group]
+            spans = []
+            for position in self.hits[group]:
+                start, end = max(0, position - before), position + after
+                if spans and start <= spans[-1][1]:
+                    spans[-1][1] = end
+                else:
+                    spans.append([start, end])
+            self._windows[group] = [self.text[start:end] for start, end in spans]
+        return self._windows[group]
+
+
+class PatternRegistry:
+    """All extraction patterns compiled up front, with per-pattern usage statistics."""
+    
+    def __init__(self, specs: Dict[str, List[Tuple[str, int]]] = PATTERN_SPECS):
+        self.budget = TimeBudget()
+        self.groups = {
+            group: [TrackedPattern(group, index, pattern, flags, self.budget)
+                    for index, (pattern, flags) in enumerate(patterns)]
+            for group, patterns in specs.items()
+        }
+    
+    def __getitem__(self, group: str) -> List[TrackedPattern]:
+        return self.groups[group]
+    
+    def drain(self) -> Dict[str, Tuple[int, int, int, float]]:
+        """Return the counters accumulated so far and reset them."""
+        counters = {}
+        for patterns in self.groups.values():
+            for tracked in patterns:
+                counters[tracked.key] = (tracked.calls, tracked.hits, tracked.matches, tracked.seconds)
+                tracked.calls = tracked.hits = tracked.matches = 0
+                tracked.seconds = 0.0
+        return counters
+    
+    def merge(self, counters: Dict[str, Tuple[int, int, int, float]]) -> None:
+        """Add counters drained from another registry, e.g. one living in a worker process."""
+        for patterns in self.groups.values():
+            for tracked in patterns:
+                if tracked.key in counters:
+                    calls, hits, matches, seconds = counters[tracked.key]
+                    tracked.calls += calls
+                    tracked.hits += hits
+                    tracked.matches += matches
+                    tracked.seconds += seconds
+    
+    def stats(self) -> List[Dict]:
+        """Per-pattern counters, most expensive first."""
+        rows = [
+            {'pattern': tracked.key, 'calls': tracked.calls, 'hits': tracked.hits,
+             'matches': tracked.matches, 'seconds': round(tracked.seconds, 6),
+             'regex': tracked.regex.pattern}
+            for patterns in self.groups.values() for tracked in patterns
+        ]
+        return sorted(rows, key=lambda row: row['seconds'], reverse=True)
+
 
 class CrunchbaseDataExtractor:
     """Simplified Crunchbase HTML data extractor with core functionality."""
     
-    def __init__(self):
+    def __init__(self, time_budget: float = 10.0, scoped_sections: bool = False):
+        self.time_budget = time_budget
+        self.scoped_sections = scoped_sections
         self.data_fields = [
             'Name', 'Founders', 'About', 'Phone', 'Contact Email', 
             'Lead Investors', 'People Headcount', 'Monthly Web visits', 
             'IT Spends', 'Total IP', 'actively Used Products', 
             'Company Location', 'Company domain link', 'Facebook link', 'LinkedIn Link'
         ]
+        self.patterns = PatternRegistry()
         
-    def clean_text(self, text: str) -> str:
-        """Clean and normalize extracted text."""
-        if not text:
-            return ""
+    def regions(self, pattern: TrackedPattern, text: str, scan: Optional[AnchorScan]) -> List[str]:
+        """Text a pattern has to look at: its field's anchor windows, or the whole text."""
+        if scan is None or pattern.key in FULL_TEXT_PATTERNS:
+            return [text]
+        return scan.windows(pattern.group)
+    
+    def extract_scoped(self, field: str, sections: Dict[str, str], text: str,
+                       scan: AnchorScan, extract, keys: Tuple[str, ...] = ()):
+        """Run extract on the field's own sections when scoping is on, else on the page.
         
-        text = re.sub(r'<[^>]+>', '', text)
-        text = text.replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
-        text = text.replace('&nbsp;', ' ').replace('&quot;', '"')
-        text = re.sub(r'\s+', ' ', text).strip()
-        text = re.sub(r'[^\w\s\-\.,@:/()&]', '', text)
+        Results are a string, a tuple of strings, or a dict expected to hold keys.
+        Every value the sections leave empty is taken from a page-level run.
+        """
+        if not self.scoped_sections:
+            return extract(text, scan)
+        section_text = '\n'.join(sections[name] for name in FIELD_SECTIONS[field] if name in sections)
+        if not section_text:
+            return extract(text, scan)
         
-        return text
+        result = extract(section_text, AnchorScan(section_text))
+        if isinstance(result, dict):
+            if not all(result.get(key) for key in keys):
+                fill_missing(result, extract(text, scan))
+            return result
+        if isinstance(result, tuple):
+            if all(result):
+                return result
+            return tuple(scoped or page for scoped, page in zip(result, extract(text, scan)))
+        return result or extract(text, scan)
+    
+    def clean_text(self, text: str) -> str:
+        """Clean and normalize extracted text."""
+        return clean_field(text)
     
     def extract_company_name(self, soup: BeautifulSoup, text: str) -> str:
         """Extract company name."""
         title = soup.find('title')
         if title:
             title_text = title.get_text()
-            match = re.search(r'^([^-]+?)\s*-\s*Crunchbase', title_text)
+            match = self.patterns['title_name'][0].search(title_text)
             if match:
                 name = self.clean_text(match.group(1))
                 if 2 <= len(name) <= 50:
@@ -49,14 +720,8 @@ class CrunchbaseDataExtractor:
             if 2 <= len(h1_text) <= 50 and not any(x in h1_text.lower() for x in ['search', 'filter', 'menu']):
                 return h1_text
         
-        name_patterns = [
-            r'^([A-Z][A-Za-z0-9\s&.-]{1,49})\s+(?:is a|provides|offers)',
-            r'About\s+([A-Z][A-Za-z0-9\s&.-]{1,49})\s+',
-            r'([A-Z][A-Za-z0-9\s&.-]{1,49})\s+-\s+Crunchbase'
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, text)
+        for pattern in self.patterns['name']:
+            match = pattern.search(text)
             if match:
                 name = self.clean_text(match.group(1))
                 if 2 <= len(name) <= 50:
@@ -64,21 +729,12 @@ class CrunchbaseDataExtractor:
         
         return ""
     
-    def extract_founders(self, soup: BeautifulSoup, text: str) -> str:
+    def extract_founders(self, soup: BeautifulSoup, text: str, scan: Optional[AnchorScan] = None) -> str:
         """Extract founder information."""
         founders = set()
         
-        founder_patterns = [
-            r'([A-Z][a-zA-Z\s]+?):\s*Co-Founder',
-            r'Co-Founder[^A-Z]*([A-Z][a-zA-Z\s]+?)(?:\s|$|\n)',
-            r'Founded by\s+([A-Z][a-zA-Z\s]+?)(?:\s+and\s+([A-Z][a-zA-Z\s]+?))?',
-            r'Founder[s]?:\s*([A-Z][a-zA-Z\s]+?)(?:\n|$|,)',
-            r'Key People\s+([A-Z][a-zA-Z\s]+?):\s*(?:Co-)?Founder',
-            r'([A-Z][a-zA-Z\s]+?)\s+and\s+([A-Z][a-zA-Z\s]+?).*?(?:co-)?founder',
-        ]
-        
-        for pattern in founder_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE | re.MULTILINE)
+        for pattern in self.patterns['founders']:
+            matches = pattern.findall_in(self.regions(pattern, text, scan))
             for match in matches:
                 if isinstance(match, tuple):
                     for name in match:
@@ -102,15 +758,8 @@ class CrunchbaseDataExtractor:
             if 50 <= len(content) <= 500:
                 return content
         
-        about_patterns = [
-            r'(?:is a|provides|offers)\s+([^.]{50,400}\.)',
-            r'About.*?\n([^.]{50,400}\.)',
-            r'Description[:\s]+([^.]{50,400}\.)',
-            r'([A-Z][^.]{100,400}\.)\s*(?:The company|Founded|Headquartered)',
-        ]
-        
-        for pattern in about_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+        for pattern in self.patterns['about']:
+            match = pattern.search(text)
             if match:
                 about_text = self.clean_text(match.group(1))
                 if 50 <= len(about_text) <= 500:
@@ -118,37 +767,24 @@ class CrunchbaseDataExtractor:
         
         return ""
     
-    def extract_contact_info(self, text: str) -> Tuple[str, str]:
+    def extract_contact_info(self, text: str, scan: Optional[AnchorScan] = None) -> Tuple[str, str]:
         """Extract phone and email."""
         phone = ""
         email = ""
         
-        phone_patterns = [
-            r'Phone\s+Number\s+([0-9\-\(\)\+\s]{10,20})',
-            r'Contact.*?(?:Phone|Tel)[:\s]+([0-9\-\(\)\+\s]{10,20})',
-            r'(\+?1[-.\s]?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4})',
-            r'([0-9]{3}[-.\s]?[0-9]{3}[-.\s]?[0-9]{4})'
-        ]
-        
-        for pattern in phone_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['phone']:
+            matches = pattern.findall_in(self.regions(pattern, text, scan))
             for match in matches:
                 clean_phone = self.clean_text(match)
-                digits_only = re.sub(r'[^\d]', '', clean_phone)
+                digits_only = NON_DIGIT_RE.sub('', clean_phone)
                 if 10 <= len(digits_only) <= 15:
                     phone = clean_phone
                     break
             if phone:
                 break
         
-        email_patterns = [
-            r'Contact\s+Email\s+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'Email[:\s]+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'\b([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b'
-        ]
-        
-        for pattern in email_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['email']:
+            matches = pattern.findall_in(self.regions(pattern, text, scan))
             for match in matches:
                 if '@' in match and '.' in match.split('@')[1]:
                     if not any(x in match.lower() for x in ['example.com', 'test.com', 'noreply']):
@@ -159,136 +795,100 @@ class CrunchbaseDataExtractor:
         
         return phone, email
     
-    def extract_financial_data(self, text: str) -> Dict[str, str]:
-        """Extract financial and business metrics."""
-        data = {}
+    def extract_financial_data(self, text: str, scan: Optional[AnchorScan] = None,
+                               data: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Extract financial and business metrics, filling data in place when given.
         
-        # Investors
-        investor_patterns = [
-            r'investors?\s+including\s+([A-Z][^.]{10,150})',
-            r'funded\s+by\s+([A-Z][^.]{10,150})',
-            r'backed\s+by\s+([A-Z][^.]{10,150})',
-            r'([A-Z][A-Za-z\s&]+)\s+and\s+([A-Z][A-Za-z\s&]+).*?investor'
-        ]
+        Metrics data already holds are kept and not searched for again.
+        """
+        data = {} if data is None else data
         
-        for pattern in investor_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                investors = self.clean_text(match.group(1))
-                if 5 <= len(investors) <= 200:
-                    data['Lead Investors'] = investors
-                    break
+        # Investors
+        if 'Lead Investors' not in data:
+            for pattern in self.patterns['investors']:
+                match = pattern.search_in(self.regions(pattern, text, scan))
+                if match:
+                    investors = self.clean_text(match.group(1))
+                    if 5 <= len(investors) <= 200:
+                        data['Lead Investors'] = investors
+                        break
         
         # Headcount
-        headcount_patterns = [
-            r'Headcount\s+([0-9,\-\s]+)',
-            r'([0-9,]+\s*-\s*[0-9,]+)\s*employees?',
-            r'employee[s]?\s*[:\s]+([0-9,\-\s]+)',
-            r'([0-9]{2,})\s*-\s*([0-9]{3,})\s*(?:people|employees?)'
-        ]
-        
-        for pattern in headcount_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if isinstance(match, tuple):
-                    headcount = f"{match[0]}-{match[1]}"
-                else:
-                    headcount = str(match)
-                
-                clean_headcount = self.clean_text(headcount)
-                if any(char.isdigit() for char in clean_headcount):
-                    data['People Headcount'] = clean_headcount
+        if 'People Headcount' not in data:
+            for pattern in self.patterns['headcount']:
+                matches = pattern.findall_in(self.regions(pattern, text, scan))
+                for match in matches:
+                    if isinstance(match, tuple):
+                        headcount = f"{match[0]}-{match[1]}"
+                    else:
+                        headcount = str(match)
+                    
+                    clean_headcount = self.clean_text(headcount)
+                    if any(char.isdigit() for char in clean_headcount):
+                        data['People Headcount'] = clean_headcount
+                        break
+                if 'People Headcount' in data:
                     break
-            if 'People Headcount' in data:
-                break
         
         # Web visits
-        visits_patterns = [
-            r'Monthly\s+Web\s+Visits[:\s\n]+([0-9,]+)',
-            r'([0-9,]{6,})\s*monthly.*?visits',
-            r'visits[:\s]+([0-9,]{6,})'
-        ]
-        
-        for pattern in visits_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                visits = self.clean_text(match)
-                if len(visits.replace(',', '').replace(' ', '')) >= 4:
-                    data['Monthly Web visits'] = visits
+        if 'Monthly Web visits' not in data:
+            for pattern in self.patterns['visits']:
+                matches = pattern.findall_in(self.regions(pattern, text, scan))
+                for match in matches:
+                    visits = self.clean_text(match)
+                    if len(visits.replace(',', '').replace(' ', '')) >= 4:
+                        data['Monthly Web visits'] = visits
+                        break
+                if 'Monthly Web visits' in data:
                     break
-            if 'Monthly Web visits' in data:
-                break
         
         # IT Spend
-        spend_patterns = [
-            r'IT\s+Spend[:\s\n]+(\$[0-9,MKB]+)',
-            r'projected\s+to\s+spend\s+(\$[0-9,MKB]+).*?IT',
-            r'(\$[0-9,]+[MKB]?)\s*.*?IT.*?spend'
-        ]
-        
-        for pattern in spend_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                spend = self.clean_text(match)
-                if '$' in spend and any(char.isdigit() for char in spend):
-                    data['IT Spends'] = spend
+        if 'IT Spends' not in data:
+            for pattern in self.patterns['it_spend']:
+                matches = pattern.findall_in(self.regions(pattern, text, scan))
+                for match in matches:
+                    spend = self.clean_text(match)
+                    if '$' in spend and any(char.isdigit() for char in spend):
+                        data['IT Spends'] = spend
+                        break
+                if 'IT Spends' in data:
                     break
-            if 'IT Spends' in data:
-                break
         
         # IP Count
-        ip_patterns = [
-            r'Total\s+IP[:\s\n]+([0-9,]+)',
-            r'intellectual\s+property.*?includes\s+([0-9,]+)',
-            r'([0-9,]+)\s*(?:registered\s+)?patents?',
-            r'([0-9,]+)\s*(?:registered\s+)?trademarks?'
-        ]
-        
-        for pattern in ip_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                ip_count = self.clean_text(match)
-                if any(char.isdigit() for char in ip_count):
-                    data['Total IP'] = ip_count
+        if 'Total IP' not in data:
+            for pattern in self.patterns['ip']:
+                matches = pattern.findall_in(self.regions(pattern, text, scan))
+                for match in matches:
+                    ip_count = self.clean_text(match)
+                    if any(char.isdigit() for char in ip_count):
+                        data['Total IP'] = ip_count
+                        break
+                if 'Total IP' in data:
                     break
-            if 'Total IP' in data:
-                break
         
         # Products Used
-        product_patterns = [
-            r'uses\s+([0-9,]+)\s*technology\s+products?.*?including\s+([^.]{20,200})',
-            r'technology.*?including\s+([^.]{20,200})',
-            r'powered\s+by\s+([^.]{20,200})'
-        ]
-        
-        for pattern in product_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if isinstance(match, tuple):
-                    products = match[1] if len(match) > 1 else match[0]
-                else:
-                    products = match
-                
-                clean_products = self.clean_text(products)
-                if 10 <= len(clean_products) <= 300:
-                    data['actively Used Products'] = clean_products
+        if 'actively Used Products' not in data:
+            for pattern in self.patterns['products']:
+                matches = pattern.findall_in(self.regions(pattern, text, scan))
+                for match in matches:
+                    if isinstance(match, tuple):
+                        products = match[1] if len(match) > 1 else match[0]
+                    else:
+                        products = match
+                    
+                    clean_products = self.clean_text(products)
+                    if 10 <= len(clean_products) <= 300:
+                        data['actively Used Products'] = clean_products
+                        break
+                if 'actively Used Products' in data:
                     break
-            if 'actively Used Products' in data:
-                break
         
         return data
     
-    def extract_location(self, text: str) -> str:
+    def extract_location(self, text: str, scan: Optional[AnchorScan] = None) -> str:
         """Extract company location."""
-        location_patterns = [
-            r'(?:located|headquartered)\s+in\s+([A-Z][^.]{10,100})',
-            r'(?:headquarters|HQ)[:\s]+([A-Z][^.]{10,100})',
-            r'([A-Z][a-zA-Z\s]+,\s*[A-Z][a-zA-Z\s]+,\s*[A-Z][a-zA-Z\s]+)(?:\.|$)',
-            r'based\s+in\s+([A-Z][^.]{10,100})'
-        ]
-        
-        for pattern in location_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in self.patterns['location']:
+            matches = pattern.findall_in(self.regions(pattern, text, scan))
             for match in matches:
                 location = self.clean_text(match)
                 if 10 <= len(location) <= 100 and ',' in location:
@@ -296,48 +896,20 @@ class CrunchbaseDataExtractor:
         
         return ""
     
-    def extract_links(self, soup: BeautifulSoup, text: str) -> Dict[str, str]:
+    def extract_links(self, soup: BeautifulSoup, text: str, scan: Optional[AnchorScan] = None) -> Dict[str, str]:
         """Extract domain and social media links."""
         links = {'Company domain link': '', 'Facebook link': '', 'LinkedIn Link': ''}
         
-        all_links = soup.find_all('a', href=True)
-        
-        for link in all_links:
-            href = link.get('href', '').lower()
-            
-            if 'crunchbase.com' in href:
-                continue
-            
-            if 'facebook.com' in href and not links['Facebook link']:
-                full_href = link.get('href')
-                if '/pages/' in full_href or len(full_href.split('/')) >= 4:
-                    links['Facebook link'] = full_href
-            
-            elif 'linkedin.com/company' in href and not links['LinkedIn Link']:
-                links['LinkedIn Link'] = link.get('href')
-            
-            elif (href.startswith('http') and 
-                  not any(x in href for x in ['twitter.com', 'instagram.com', 'youtube.com', 
-                                             'google.com', 'facebook.com', 'linkedin.com']) and
-                  not links['Company domain link']):
-                domain_match = re.search(r'https?://(?:www\.)?([a-zA-Z0-9.-]+)', href)
-                if domain_match:
-                    domain = domain_match.group(1)
-                    if ('.' in domain and 
-                        len(domain.split('.')) >= 2 and 
-                        not domain.endswith(('.gov', '.edu')) and
-                        len(domain) <= 50):
-                        links['Company domain link'] = domain
+        for link in soup.find_all('a', href=True):
+            field, value = classify_link(link['href'])
+            if field and not links[field]:
+                links[field] = value
+                if all(links.values()):
+                    break
         
         if not links['Company domain link']:
-            domain_patterns = [
-                r'(?:www\.)?([a-zA-Z0-9.-]+\.(?:com|org|net|io))',
-                r'visit\s+(?:www\.)?([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-                r'website[:\s]+(?:www\.)?([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
-            ]
-            
-            for pattern in domain_patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
+            for pattern in self.patterns['text_domain']:
+                matches = pattern.findall_in(self.regions(pattern, text, scan))
                 for match in matches:
                     if not any(x in match.lower() for x in ['crunchbase', 'linkedin', 'facebook']):
                         if len(match) <= 50 and '.' in match:
@@ -348,6 +920,47 @@ class CrunchbaseDataExtractor:
         
         return links
     
+    def extract_from_state(self, entity: dict) -> Dict[str, str]:
+        """Read profile fields straight from the embedded state entity; absent fields are left out."""
+        fields = {}
+        for card in entity['cards'].values():
+            if isinstance(card, dict):
+                fields.update(card)
+        fields.update(entity['properties'])
+        data = {}
+        
+        data['Name'] = identifier_value(fields.get('identifier')) or identifier_value(fields.get('title'))
+        founders = {identifier_value(founder) for founder in fields.get('founder_identifiers') or []}
+        data['Founders'] = '; '.join(sorted(founders - {''})[:5])
+        
+        headcount = HEADCOUNT_ENUM_RE.fullmatch(str(fields.get('num_employees_enum') or ''))
+        if headcount:
+            low, high = headcount.groups()
+            data['People Headcount'] = f"{low}-{high}" if high else f"{low}+"
+        visits = fields.get('semrush_visits_latest_month')
+        if isinstance(visits, (int, float)):
+            data['Monthly Web visits'] = f"{int(visits):,}"
+        it_spend = fields.get('aberdeen_it_spend')
+        if isinstance(it_spend, dict) and isinstance(it_spend.get('value_usd'), (int, float)):
+            data['IT Spends'] = f"${int(it_spend['value_usd']):,}"
+        ip_counts = [fields.get(key) for key in ('ipqwery_num_patent_granted', 'ipqwery_num_trademark_registered')]
+        if any(isinstance(count, int) for count in ip_counts):
+            data['Total IP'] = str(sum(count for count in ip_counts if isinstance(count, int)))
+        
+        locations = [loc for loc in fields.get('location_identifiers') or []
+                     if isinstance(loc, dict) and loc.get('location_type') in LOCATION_ORDER]
+        locations.sort(key=lambda loc: LOCATION_ORDER[loc['location_type']])
+        data['Company Location'] = ', '.join(filter(None, map(identifier_value, locations)))
+        
+        website = identifier_value(fields.get('website'))
+        field, domain = classify_link(website) if website else ('', '')
+        if field == 'Company domain link':
+            data['Company domain link'] = domain
+        data['Facebook link'] = identifier_value(fields.get('facebook'))
+        data['LinkedIn Link'] = identifier_value(fields.get('linkedin'))
+        
+        return {field: value for field, value in data.items() if value}
+    
     def extract_data_from_html(self, html_file_path: str) -> Dict[str, str]:
         """Main extraction method for a single HTML file."""
         try:
@@ -356,30 +969,57 @@ class CrunchbaseDataExtractor:
         except Exception:
             return {field: "" for field in self.data_fields}
         
+        extracted_data = {field: "" for field in self.data_fields}
+        state = load_app_state(html_content)
+        entity = find_profile_entity(state) if state else None
+        if entity:
+            extracted_data.update(self.extract_from_state(entity))
+        
+        # Heuristic text extraction, only for fields the embedded state did not supply
         soup = BeautifulSoup(html_content, 'html.parser')
-        text = soup.get_text()
+        text = visible_text(soup)
+        scan = AnchorScan(text)
+        sections = page_sections(soup) if self.scoped_sections else {}
         
-        extracted_data = {field: "" for field in self.data_fields}
+        financials = {}  # filled in place so a timeout keeps the metrics found so far
+        financial_fields = ('Lead Investors', 'People Headcount', 'Monthly Web visits',
+                            'IT Spends', 'Total IP', 'actively Used Products')
         
+        self.patterns.budget.start(self.time_budget)
         try:
-            extracted_data['Name'] = self.extract_company_name(soup, text)
-            extracted_data['Founders'] = self.extract_founders(soup, text)
-            extracted_data['About'] = self.extract_about(soup, text)
+            if not extracted_data['Name']:
+                extracted_data['Name'] = self.extract_company_name(soup, text)
+            if not extracted_data['Founders']:
+                extracted_data['Founders'] = self.extract_scoped(
+                    'founders', sections, text, scan, lambda t, s: self.extract_founders(soup, t, s))
+            if not extracted_data['About']:
+                extracted_data['About'] = self.extract_about(soup, text)
             
-            phone, email = self.extract_contact_info(text)
-            extracted_data['Phone'] = phone
-            extracted_data['Contact Email'] = email
+            if not (extracted_data['Phone'] and extracted_data['Contact Email']):
+                phone, email = self.extract_scoped('contact', sections, text, scan, self.extract_contact_info)
+                fill_missing(extracted_data, {'Phone': phone, 'Contact Email': email})
             
-            financial_data = self.extract_financial_data(text)
-            extracted_data.update(financial_data)
+            if not all(extracted_data[field] for field in financial_fields):
+                self.extract_scoped('financials', sections, text, scan,
+                                    lambda t, s: self.extract_financial_data(t, s, financials),
+                                    tuple(field for field in financial_fields if not extracted_data[field]))
             
-            extracted_data['Company Location'] = self.extract_location(text)
+            if not extracted_data['Company Location']:
+                extracted_data['Company Location'] = self.extract_scoped(
+                    'location', sections, text, scan, self.extract_location)
             
-            links = self.extract_links(soup, text)
-            extracted_data.update(links)
+            if not (extracted_data['Company domain link'] and extracted_data['Facebook link']
+                    and extracted_data['LinkedIn Link']):
+                fill_missing(extracted_data, self.extract_links(soup, text, scan))
             
+        except ExtractionTimeout:
+            logger.warning("Extraction of %s exceeded its %.1fs CPU budget; keeping partial results",
+                           html_file_path, self.time_budget)
         except Exception:
             pass
+        finally:
+            fill_missing(extracted_data, financials)
+            self.patterns.budget.start(None)
         
         return extracted_data
     
@@ -401,8 +1041,57 @@ class CrunchbaseDataExtractor:
         except Exception:
             return False
     
-    def process_html_files(self, input_folder: str, output_file: str) -> None:
-        """Process all HTML files and generate Excel output."""
+    def extract_files(self, file_paths: List[str], workers: int = 1) -> List[Dict[str, str]]:
+        """Run extract_data_from_html over file_paths, in order, optionally across a process pool."""
+        if workers <= 1 or len(file_paths) <= 1:
+            return [self.extract_data_from_html(file_path) for file_path in file_paths]
+        
+        results = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(file_paths)),
+                                 initializer=_init_worker,
+                                 initargs=(self.time_budget, self.scoped_sections)) as pool:
+            for extracted_data, counters in pool.map(_extract_in_worker, file_paths):
+                self.patterns.merge(counters)
+                results.append(extracted_data)
+        return results
+    
+    def write_output(self, df: pd.DataFrame, output_file: str) -> str:
+        """Durably write df to output_file (CSV if Excel fails); return the path written or '' on failure."""
+        for path, write in ((output_file, lambda f: df.to_excel(f, index=False, engine='openpyxl')),
+                            (output_file.replace('.xlsx', '.csv'), lambda f: df.to_csv(f, index=False))):
+            tmp_path = f"{path}.tmp"
+            try:
+                with open(tmp_path, 'wb') as handle:
+                    write(handle)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                os.replace(tmp_path, path)
+                return path
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return ''
+    
+    def release_inputs(self, file_paths: List[str], processed_dir: str = '') -> None:
+        """Delete processed HTML files, or move them into processed_dir when one is given."""
+        if processed_dir:
+            os.makedirs(processed_dir, exist_ok=True)
+        for file_path in file_paths:
+            try:
+                if processed_dir:
+                    shutil.move(file_path, os.path.join(processed_dir, os.path.basename(file_path)))
+                else:
+                    os.remove(file_path)
+            except Exception:
+                pass
+    
+    def process_html_files(self, input_folder: str, output_file: str, workers: int = 1,
+                           processed_dir: str = '') -> None:
+        """Process all HTML files and generate Excel output.
+        
+        Input files are only deleted (or moved to processed_dir) once the combined
+        output has been written, so an interrupted run never loses pages.
+        """
         if not os.path.exists(input_folder):
             return
         
@@ -411,50 +1100,102 @@ class CrunchbaseDataExtractor:
         if not html_files:
             return
         
-        all_data = []
-        
-        for html_file in html_files:
-            file_path = os.path.join(input_folder, html_file)
-            extracted_data = self.extract_data_from_html(file_path)
+        file_paths = [os.path.join(input_folder, html_file) for html_file in html_files]
+        all_data = self.extract_files(file_paths, workers)
+        for html_file, extracted_data in zip(html_files, all_data):
             extracted_data['Source File'] = html_file
-            all_data.append(extracted_data)
-            
-            # Delete HTML file after processing
-            try:
-                os.remove(file_path)
-            except Exception:
-                pass
         
         # Create and save DataFrame
         df = pd.DataFrame(all_data)
         column_order = self.data_fields + ['Source File']
         df = df[column_order]
         
-        # Save Excel file
-        try:
-            df.to_excel(output_file, index=False, engine='openpyxl')
-            
-            # Upload to n8n webhook
-            if os.path.exists(output_file):
-                self.upload_to_n8n(output_file)
-                
-        except Exception:
-            csv_file = output_file.replace('.xlsx', '.csv')
-            df.to_csv(csv_file, index=False)
-            
-            # Try to upload CSV if Excel failed
-            if os.path.exists(csv_file):
-                self.upload_to_n8n(csv_file)
+        written_file = self.write_output(df, output_file)
+        if not written_file:
+            return
+        
+        self.release_inputs(file_paths, processed_dir)
+        
+        # Upload to n8n webhook
+        self.upload_to_n8n(written_file)
+    
+    def watch_spool(self, spool_dir: str, output_file: str, batch_size: int = 10, max_delay: float = 2.0,
+                    poll_interval: float = 0.5, processed_dir: str = '') -> None:
+        """Extract pages as they land in spool_dir, writing one output file per micro-batch.
+        
+        Several watchers may share a spool: each claims pages by renaming them into its
+        own claim directory and runs process_html_files over that, so no page is
+        extracted twice and a failed write leaves the batch claimed for the next attempt.
+        """
+        claim_dir = worker_claim_dir(spool_dir)
+        requeue_orphaned_claims(spool_dir)
+        
+        output_stem, output_ext = os.path.splitext(output_file)
+        first_claimed = None
+        batch_number = 0
+        while True:
+            pending = sum(1 for name in os.listdir(claim_dir) if name.lower().endswith('.html'))
+            pending += len(claim_spool_files(spool_dir, claim_dir, batch_size - pending,
+                                             lambda name: name.lower().endswith('.html')))
+            if pending and first_claimed is None:
+                first_claimed = time.monotonic()
+            if pending and (pending >= batch_size or time.monotonic() - first_claimed >= max_delay):
+                batch_number += 1
+                batch_output = f"{output_stem}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{batch_number}{output_ext}"
+                self.process_html_files(claim_dir, batch_output, processed_dir=processed_dir)
+                first_claimed = None
+            time.sleep(poll_interval)
+
+
+_worker_extractor = None
+
+def _init_worker(time_budget: float, scoped_sections: bool):
+    global _worker_extractor
+    _worker_extractor = CrunchbaseDataExtractor(time_budget, scoped_sections)
+
+def _extract_in_worker(file_path: str):
+    extracted_data = _worker_extractor.extract_data_from_html(file_path)
+    return extracted_data, _worker_extractor.patterns.drain()
 
 def main():
     parser = argparse.ArgumentParser(description='Extract company data from Crunchbase HTML files')
-    parser.add_argument('--input_folder', '-i', required=True, help='Path to folder containing HTML files')
+    parser.add_argument('--input_folder', '-i', help='Path to folder containing HTML files')
     parser.add_argument('--output_file', '-o', default='crunchbase_companies.xlsx', help='Output Excel file path')
+    parser.add_argument('--workers', '-w', type=int, default=1, help='Number of worker processes used for extraction')
+    parser.add_argument('--processed-dir', default='', help='Move processed HTML files here instead of deleting them')
+    parser.add_argument('--time-budget', type=float, default=10.0,
+                        help='CPU seconds allowed per file before extraction stops with partial results (0 disables)')
+    parser.add_argument('--scoped-sections', action='store_true',
+                        help='Run founder/contact/financial/location patterns only on their page sections')
+    parser.add_argument('--watch', metavar='SPOOL_DIR',
+                        help='Keep running and extract pages as they land in SPOOL_DIR; '
+                             'each micro-batch is written next to the output file with a timestamp suffix')
+    parser.add_argument('--batch-size', type=int, default=10, help='Pages per micro-batch in watch mode')
+    parser.add_argument('--max-delay', type=float, default=2.0,
+                        help='Seconds a claimed page may wait for its micro-batch to fill in watch mode')
+    parser.add_argument('--pattern-stats', action='store_true', help='Print per-pattern call, match and timing counters')
     
     args = parser.parse_args()
+    if not args.input_folder and not args.watch:
+        parser.error('one of --input_folder/-i or --watch is required')
+    
+    extractor = CrunchbaseDataExtractor(args.time_budget, args.scoped_sections)
+    if args.watch:
+        # In watch mode each worker is its own watcher claiming micro-batches from the shared spool
+        watchers = [Process(target=extractor.watch_spool,
+                            args=(args.watch, args.output_file, args.batch_size, args.max_delay),
+                            kwargs={'processed_dir': args.processed_dir})
+                    for _ in range(max(1, args.workers))]
+        for watcher in watchers:
+            watcher.start()
+        for watcher in watchers:
+            watcher.join()
+        return
+    
+    extractor.process_html_files(args.input_folder, args.output_file, args.workers, args.processed_dir)
     
-    extractor = CrunchbaseDataExtractor()
-    extractor.process_html_files(args.input_folder, args.output_file)
+    if args.pattern_stats:
+        print(pd.DataFrame(extractor.patterns.stats()).to_string(index=False))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Offline public-suffix table for turning hostnames into registrable domains.
+
+Every single-label TLD is a public suffix, so only the multi-label entries of
+the Public Suffix List need listing: the ccTLD second levels and the hosting
+platforms (github.io, herokuapp.com, ...) that company links actually use.
+"""
+
+from functools import lru_cache
+
+MULTI_LABEL_SUFFIXES = frozenset('''
+    co.uk org.uk me.uk ltd.uk plc.uk net.uk ac.uk gov.uk nhs.uk sch.uk
+    com.au net.au org.au edu.au gov.au asn.au id.au
+    co.nz net.nz org.nz govt.nz ac.nz
+    co.jp ne.jp or.jp ac.jp go.jp gr.jp
+    co.kr or.kr ne.kr re.kr go.kr ac.kr
+    co.in net.in org.in firm.in gen.in ind.in ac.in gov.in
+    com.cn net.cn org.cn gov.cn edu.cn
+    com.hk net.hk org.hk edu.hk gov.hk
+    com.tw net.tw org.tw edu.tw gov.tw
+    com.sg net.sg org.sg edu.sg gov.sg
+    com.my net.my org.my edu.my gov.my
+    co.id or.id ac.id go.id web.id
+    com.ph net.ph org.ph
+    com.vn net.vn
+    co.th in.th ac.th go.th
+    com.pk net.pk org.pk
+    com.bd
+    com.br net.br org.br gov.br edu.br
+    com.mx net.mx org.mx gob.mx edu.mx
+    com.ar net.ar org.ar gob.ar
+    com.co net.co org.co
+    com.pe org.pe
+    co.cl
+    com.uy
+    co.ve com.ve
+    co.za org.za net.za gov.za ac.za
+    com.ng org.ng gov.ng
+    co.ke or.ke ac.ke
+    com.eg
+    co.il org.il ac.il gov.il
+    com.tr net.tr org.tr gov.tr
+    com.sa net.sa org.sa
+    co.ae
+    com.qa
+    com.ua org.ua
+    com.pl net.pl org.pl
+    co.at or.at
+    com.es org.es
+    com.pt
+    com.gr
+    com.cy
+    com.mt
+    co.hu
+    com.ru org.ru net.ru
+    github.io gitlab.io herokuapp.com appspot.com blogspot.com
+    netlify.app vercel.app web.app firebaseapp.com pages.dev workers.dev
+    azurewebsites.net cloudfront.net amazonaws.com
+    wixsite.com myshopify.com squarespace.com wordpress.com webflow.io
+    notion.site carrd.co framer.website
+'''.split())
+
+
+@lru_cache(maxsize=16384)
+def registrable_domain(host: str) -> str:
+    """The registrable domain (public suffix plus one label) of host; IPs and bare labels come back unchanged."""
+    host = host.lower().rstrip('.')
+    labels = host.split('.')
+    if len(labels) < 2 or labels[-1].isdigit():
+        return host
+    for i in range(1, len(labels) - 1):
+        if '.'.join(labels[i:]) in MULTI_LABEL_SUFFIXES:
+            return '.'.join(labels[i - 1:])
+    return '.'.join(labels[-2:])
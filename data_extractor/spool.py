@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Claiming pages from a spool directory shared by several watch-mode workers.
+
+A worker claims a page by renaming it into its own .claimed/<pid> directory,
+which is atomic on one filesystem, so no page is handed to two workers. Claims
+left behind by workers that died are moved back into the spool on startup.
+"""
+
+import os
+import time
+from typing import Callable, List
+
+# Per-worker subdirectory of a watched spool that claimed pages are renamed into
+CLAIM_DIR = '.claimed'
+
+
+def worker_claim_dir(spool_dir: str) -> str:
+    """Create and return this process's claim directory under spool_dir."""
+    claim_dir = os.path.join(spool_dir, CLAIM_DIR, str(os.getpid()))
+    os.makedirs(claim_dir, exist_ok=True)
+    return claim_dir
+
+
+def claim_spool_files(spool_dir: str, claim_dir: str, limit: int,
+                      wanted: Callable[[str], bool], settle: float = 1.0) -> List[str]:
+    """Atomically rename up to limit settled files whose name is wanted from spool_dir into claim_dir.
+
+    A file another worker renamed first disappears from under us and is skipped.
+    """
+    claimed = []
+    now = time.time()
+    for entry in sorted(os.scandir(spool_dir), key=lambda e: e.name):
+        if len(claimed) >= limit:
+            break
+        if not entry.is_file() or not wanted(entry.name):
+            continue
+        target = os.path.join(claim_dir, entry.name)
+        try:
+            # Playwright writes pages in place, so wait until a file stops changing
+            if now - entry.stat().st_mtime < settle:
+                continue
+            os.rename(entry.path, target)
+        except FileNotFoundError:
+            continue
+        claimed.append(target)
+    return claimed
+
+
+def requeue_orphaned_claims(spool_dir: str) -> None:
+    """Move files claimed by workers that are no longer running back into the spool."""
+    claims_root = os.path.join(spool_dir, CLAIM_DIR)
+    if not os.path.isdir(claims_root):
+        return
+    for worker in os.listdir(claims_root):
+        try:
+            os.kill(int(worker), 0)
+            continue
+        except (ValueError, ProcessLookupError):
+            pass
+        except PermissionError:
+            continue
+        worker_dir = os.path.join(claims_root, worker)
+        for name in os.listdir(worker_dir):
+            try:
+                os.rename(os.path.join(worker_dir, name), os.path.join(spool_dir, name))
+            except OSError:
+                pass
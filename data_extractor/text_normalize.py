@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Shared text normalization for the G2, Crunchbase and Clay extractors.
+
+Everything here is precompiled once at import time; short strings such as
+names, titles and locations repeat constantly across pages, so their
+normalized forms are memoized in bounded caches.
+"""
+
+import re
+from functools import lru_cache
+from html import unescape
+
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+# Anything outside word characters, whitespace and - . , @ : / ( ) &
+DISALLOWED_CHARS_RE = re.compile(r'[^\w\s\-\.,@:/()&]')
+
+# Zero-width and formatting characters that render as nothing but break string equality
+INVISIBLE_CHARS = str.maketrans(dict.fromkeys('\xad\u200b\u200c\u200d\u2060\ufeff'))
+
+# Strings up to this length go through the memoized paths
+SHORT_TEXT = 256
+CACHE_SIZE = 16384
+
+
+def _normalize_space(text: str) -> str:
+    # str.split() splits on exactly the characters re's \s matches, so this
+    # equals re.sub(r'\s+', ' ', text).strip() without the regex machinery
+    return ' '.join(text.translate(INVISIBLE_CHARS).split())
+
+
+_normalize_space_cached = lru_cache(maxsize=CACHE_SIZE)(_normalize_space)
+
+
+def normalize_space(text: str) -> str:
+    """Collapse whitespace runs to single spaces, trim, and drop zero-width characters."""
+    if len(text) <= SHORT_TEXT:
+        return _normalize_space_cached(text)
+    return _normalize_space(text)
+
+
+def strip_tags(html: str, replacement: str = ' ') -> str:
+    """Replace every markup tag in html with replacement."""
+    if '<' not in html:
+        return html
+    return HTML_TAG_RE.sub(replacement, html)
+
+
+def decode_entities(text: str) -> str:
+    """Decode named and numeric HTML character references."""
+    if '&' not in text:
+        return text
+    return unescape(text)
+
+
+def _clean_field(text: str) -> str:
+    text = decode_entities(strip_tags(text, ''))
+    return DISALLOWED_CHARS_RE.sub('', _normalize_space(text))
+
+
+_clean_field_cached = lru_cache(maxsize=CACHE_SIZE)(_clean_field)
+
+
+def clean_field(text: str) -> str:
+    """Tag-free, entity-decoded, whitespace-normalized text restricted to word characters and basic punctuation."""
+    if not text:
+        return ''
+    if len(text) <= SHORT_TEXT:
+        return _clean_field_cached(text)
+    return _clean_field(text)
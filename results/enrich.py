@@ -1,18 +1,34 @@
 #!/usr/bin/env python3
 import re, json
+import sys
+import time
+import hashlib
+import urllib.parse
+from bisect import bisect_right
 from pathlib import Path
 from bs4 import BeautifulSoup
 import pandas as pd
 import glob
 import os
 import subprocess
+import argparse
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Process
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "data_extractor"))
+from spool import claim_spool_files, requeue_orphaned_claims, worker_claim_dir
+from text_normalize import normalize_space
 
 INPUT_PATTERN = "g2-page-*.html"  
 OUT_XLSX = "G2_Company_Data_All_Pages.xlsx"
+MANIFEST_FILE = "g2_extraction_manifest.json"
+# Bump when extraction logic changes so cached page records are re-extracted
+MANIFEST_VERSION = 2
 
 def clean(s):
     if not s: return None
-    s = re.sub(r"\s+", " ", s).strip()
+    s = normalize_space(s)
     return s or None
 
 def load_html(path):
@@ -24,27 +40,143 @@ def extract_number_from_text(text):
     match = re.search(r'(\d+)', cleaned)
     return int(match.group(1)) if match else None
 
+YEAR_FOUNDED_RE = re.compile(r'Year Founded\s*(\d{4})')
+HQ_LOCATION_RE = re.compile(r'HQ Location\s*(.+?)(?:\n|$)')
+TWITTER_FOLLOWERS_RE = re.compile(r'([\d,]+)\s+Twitter followers')
+TWITTER_HANDLE_RE = re.compile(r'@([a-zA-Z_][a-zA-Z0-9_]*?)(?=\s|\d|$)')
+LINKEDIN_EMPLOYEES_RE = re.compile(r'([\d,]+)\s+employees on LinkedIn')
+SECURE_URL_RE = re.compile(r'secure%5Burl%5D=([^&]+)')
+ICON_CLASS_RE = re.compile(r'icon-(calendar|location|twitter|linkedin|website)')
+
+def extract_year_founded(container, company_data):
+    year_match = YEAR_FOUNDED_RE.search(container.get_text())
+    if year_match:
+        company_data['year_founded'] = int(year_match.group(1))
+
+def extract_hq_location(container, company_data):
+    location_match = HQ_LOCATION_RE.search(container.get_text())
+    if location_match:
+        company_data['hq_location'] = clean(location_match.group(1))
+
+def extract_twitter_info(container, company_data):
+    twitter_text = container.get_text()
+    
+    followers_match = TWITTER_FOLLOWERS_RE.search(twitter_text)
+    if followers_match:
+        company_data['twitter_followers'] = extract_number_from_text(followers_match.group(1))
+    
+    twitter_handle_match = TWITTER_HANDLE_RE.search(twitter_text)
+    if twitter_handle_match:
+        company_data['twitter_id'] = twitter_handle_match.group(1)
+
+def extract_linkedin_info(container, company_data):
+    linkedin_link = container.find('a', {'class': 'link js-log-click'})
+    if linkedin_link:
+        linkedin_href = linkedin_link.get('href')
+        if 'linkedin.com' in linkedin_href:
+            company_data['linkedin_url'] = linkedin_href
+        else:
+            url_match = SECURE_URL_RE.search(linkedin_href)
+            if url_match:
+                company_data['linkedin_url'] = urllib.parse.unquote(url_match.group(1))
+    
+    employees_match = LINKEDIN_EMPLOYEES_RE.search(container.get_text())
+    if employees_match:
+        company_data['linkedin_employees'] = extract_number_from_text(employees_match.group(1))
+
+def extract_company_website(container, company_data):
+    website_button = container.find('button', {'class': 'link'})
+    if website_button:
+        company_data['company_website'] = clean(website_button.get_text())
+
+# Field handlers keyed by the icon-* class that marks their container, in output order
+ICON_HANDLERS = {
+    'calendar': extract_year_founded,
+    'location': extract_hq_location,
+    'twitter': extract_twitter_info,
+    'linkedin': extract_linkedin_info,
+    'website': extract_company_website,
+}
+
+def find_section_icons(section):
+    """Map each icon name to the first svg in the section carrying it, in one subtree walk."""
+    icons = {}
+    for svg in section.find_all('svg', class_=True):
+        classes = svg.get('class')
+        if isinstance(classes, str):
+            classes = [classes]
+        for css_class in classes:
+            for icon_match in ICON_CLASS_RE.finditer(css_class):
+                icons.setdefault(icon_match.group(1), svg)
+        if len(icons) == len(ICON_HANDLERS):
+            break
+    return icons
+
+def build_name_index(soup):
+    """Index every itemprop="name" div by document position in one walk of the tree."""
+    positions = {}
+    name_positions = []
+    name_elems = []
+    for position, element in enumerate(soup.descendants):
+        positions[id(element)] = position
+        if element.name == 'div' and element.get('itemprop') == 'name':
+            name_positions.append(position)
+            name_elems.append(element)
+    return {
+        'positions': positions,
+        'name_positions': name_positions,
+        'name_elems': name_elems,
+        'first_in_subtree': {},
+    }
+
+def first_name_in_subtree(element, name_index):
+    """Equivalent of element.find('div', {'itemprop': 'name'}), answered by bisect and memoized."""
+    memo = name_index['first_in_subtree']
+    key = id(element)
+    if key not in memo:
+        positions = name_index['positions']
+        name_positions = name_index['name_positions']
+        start = positions.get(key, -1)
+        end = positions[id(element._last_descendant())]
+        i = bisect_right(name_positions, start)
+        memo[key] = name_index['name_elems'][i] if i < len(name_positions) and name_positions[i] <= end else None
+    return memo[key]
+
+def find_company_name_elem(section, name_index):
+    company_name_elem = first_name_in_subtree(section, name_index)
+    if not company_name_elem:
+        parent = section.parent
+        if parent:
+            company_name_elem = first_name_in_subtree(parent, name_index)
+        if not company_name_elem:
+            # Nearest name div after the section; the section itself holds none
+            name_positions = name_index['name_positions']
+            i = bisect_right(name_positions, name_index['positions'][id(section)])
+            if i < len(name_positions):
+                company_name_elem = name_index['name_elems'][i]
+    return company_name_elem
+
 def extract_seller_details_sections(soup):
     companies = []
     
     # Find all product cards and seller details sections
     product_cards = soup.find_all('div', {'class': re.compile(r'.*product.*card.*')})
     seller_sections = soup.find_all('div', {'id': re.compile(r'.*-seller_details.*')})
-    all_sections = product_cards + seller_sections
+    name_index = build_name_index(soup)
+    
+    # A div can match both selectors; only process it once
+    seen_sections = set()
+    all_sections = []
+    for section in product_cards + seller_sections:
+        if id(section) not in seen_sections:
+            seen_sections.add(id(section))
+            all_sections.append(section)
     
     for section in all_sections:
         company_data = {}
         
-        # Extract company name from itemprop="name"
-        company_name_elem = section.find('div', {'itemprop': 'name'})
-        if not company_name_elem:
-            parent = section.parent
-            if parent:
-                company_name_elem = parent.find('div', {'itemprop': 'name'})
-            if not company_name_elem:
-                siblings = section.find_all_next('div', {'itemprop': 'name'}, limit=3)
-                if siblings:
-                    company_name_elem = siblings[0]
+        # Extract company name from itemprop="name": section, then parent, then the next one in the document
+        company_name_elem = find_company_name_elem(section, name_index)
         
         if company_name_elem:
             company_data['company_name'] = clean(company_name_elem.get_text())
@@ -64,64 +196,12 @@ def extract_seller_details_sections(soup):
         # Extract other details if we have company/seller name
         if company_data.get('company_name') or company_data.get('seller_name'):
             
-            # Year Founded
-            calendar_section = section.find('svg', {'class': re.compile(r'.*icon-calendar.*')})
-            if calendar_section and calendar_section.parent:
-                year_text = calendar_section.parent.parent.get_text()
-                year_match = re.search(r'Year Founded\s*(\d{4})', year_text)
-                if year_match:
-                    company_data['year_founded'] = int(year_match.group(1))
-            
-            # HQ Location
-            location_section = section.find('svg', {'class': re.compile(r'.*icon-location.*')})
-            if location_section and location_section.parent:
-                location_text = location_section.parent.parent.get_text()
-                location_match = re.search(r'HQ Location\s*(.+?)(?:\n|$)', location_text)
-                if location_match:
-                    company_data['hq_location'] = clean(location_match.group(1))
-            
-            # Twitter Info
-            twitter_section = section.find('svg', {'class': re.compile(r'.*icon-twitter.*')})
-            if twitter_section and twitter_section.parent:
-                twitter_text = twitter_section.parent.parent.get_text()
-                
-                followers_match = re.search(r'([\d,]+)\s+Twitter followers', twitter_text)
-                if followers_match:
-                    company_data['twitter_followers'] = extract_number_from_text(followers_match.group(1))
-                
-                twitter_handle_match = re.search(r'@([a-zA-Z_][a-zA-Z0-9_]*?)(?=\s|\d|$)', twitter_text)
-                if twitter_handle_match:
-                    company_data['twitter_id'] = twitter_handle_match.group(1)
-            
-            # LinkedIn Info
-            linkedin_section = section.find('svg', {'class': re.compile(r'.*icon-linkedin.*')})
-            if linkedin_section and linkedin_section.parent:
-                linkedin_container = linkedin_section.parent.parent
-                
-                linkedin_link = linkedin_container.find('a', {'class': 'link js-log-click'})
-                if linkedin_link:
-                    linkedin_href = linkedin_link.get('href')
-                    if 'linkedin.com' in linkedin_href:
-                        company_data['linkedin_url'] = linkedin_href
-                    else:
-                        url_match = re.search(r'secure%5Burl%5D=([^&]+)', linkedin_href)
-                        if url_match:
-                            import urllib.parse
-                            decoded_url = urllib.parse.unquote(url_match.group(1))
-                            company_data['linkedin_url'] = decoded_url
-                
-                linkedin_text = linkedin_container.get_text()
-                employees_match = re.search(r'([\d,]+)\s+employees on LinkedIn', linkedin_text)
-                if employees_match:
-                    company_data['linkedin_employees'] = extract_number_from_text(employees_match.group(1))
-            
-            # Company Website
-            website_section = section.find('svg', {'class': re.compile(r'.*icon-website.*')})
-            if website_section and website_section.parent:
-                website_container = website_section.parent.parent
-                website_button = website_container.find('button', {'class': 'link'})
-                if website_button:
-                    company_data['company_website'] = clean(website_button.get_text())
+            # Walk the section's svgs once and hand each icon's container to its field handler
+            icons = find_section_icons(section)
+            for icon_name, handler in ICON_HANDLERS.items():
+                icon = icons.get(icon_name)
+                if icon and icon.parent:
+                    handler(icon.parent.parent, company_data)
             
             companies.append(company_data)
     
@@ -143,11 +223,183 @@ def merge_company_data(companies_list):
     
     return list(merged.values())
 
-def process_single_html_file(html_file):
+# Opening tag of a product-card or *-seller_details container, and any div open/close tag
+SECTION_START_RE = re.compile(
+    r'<div\b[^>]*?\b(?:class\s*=\s*["\']?[^"\'>]*product[^"\'>]*card|id\s*=\s*["\']?[^"\'>]*-seller_details)[^>]*>',
+    re.IGNORECASE,
+)
+DIV_TAG_RE = re.compile(r'<(/?)div\b[^>]*>', re.IGNORECASE)
+
+def extract_section_fragments(html):
+    """Slice the outermost card/seller-details divs out of the raw page by balancing div tags.
+
+    Returns None if a container never closes, so the caller can fall back to the full DOM.
+    """
+    fragments = []
+    pos = 0
+    while True:
+        start_match = SECTION_START_RE.search(html, pos)
+        if not start_match:
+            return fragments
+        depth = 0
+        for div_tag in DIV_TAG_RE.finditer(html, start_match.start()):
+            depth += -1 if div_tag.group(1) else 1
+            if depth == 0:
+                break
+        else:
+            return None
+        fragments.append(html[start_match.start():div_tag.end()])
+        pos = div_tag.end()
+
+def parse_section_fragments(html):
+    fragments = extract_section_fragments(html)
+    if fragments is None:
+        return BeautifulSoup(html, "lxml")
+    # Each fragment gets its own wrapper standing in for its original parent container,
+    # so the parent lookup in find_company_name_elem cannot see neighbouring cards
+    body = ''.join(f'<div>{fragment}</div>' for fragment in fragments)
+    return BeautifulSoup(f'<html><body>{body}</body></html>', "lxml")
+
+def process_single_html_file(html_file, fragments_only=False):
     html = load_html(html_file)
-    soup = BeautifulSoup(html, "lxml")
+    soup = parse_section_fragments(html) if fragments_only else BeautifulSoup(html, "lxml")
     return extract_seller_details_sections(soup)
 
+def process_html_files(html_files, workers=1, fragments_only=False):
+    """Extract every page, fanning out across a process pool when workers > 1.
+
+    Results come back in the order of html_files so merge_company_data keeps
+    its first-wins semantics regardless of which worker finishes first.
+    """
+    process_file = partial(process_single_html_file, fragments_only=fragments_only)
+    if workers <= 1 or len(html_files) <= 1:
+        return [process_file(f) for f in html_files]
+    
+    workers = min(workers, len(html_files))
+    chunksize = max(1, len(html_files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(process_file, html_files, chunksize=chunksize))
+
+def file_digest(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def load_manifest(path):
+    """Load cached per-page records; a missing, unreadable or outdated manifest is treated as empty."""
+    try:
+        manifest = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('pages', {})
+
+def save_manifest(path, pages):
+    tmp_path = f"{path}.tmp"
+    Path(tmp_path).write_text(json.dumps({'version': MANIFEST_VERSION, 'pages': pages}), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+def process_html_files_incremental(html_files, manifest_path, workers=1, fragments_only=False, rebuild=False):
+    """Re-extract only pages whose content hash changed since the last run, serving the rest from the manifest."""
+    cached_pages = {} if rebuild else load_manifest(manifest_path)
+    digests = {html_file: file_digest(html_file) for html_file in html_files}
+    
+    changed_files = [
+        html_file for html_file in html_files
+        if cached_pages.get(os.path.basename(html_file), {}).get('sha256') != digests[html_file]
+    ]
+    fresh_results = dict(zip(changed_files, process_html_files(changed_files, workers, fragments_only)))
+    
+    pages = {}
+    results = []
+    for html_file in html_files:
+        page_key = os.path.basename(html_file)
+        if html_file in fresh_results:
+            companies = fresh_results[html_file]
+        else:
+            companies = cached_pages[page_key]['companies']
+        pages[page_key] = {'sha256': digests[html_file], 'companies': companies}
+        results.append(companies)
+    
+    if changed_files or set(pages) != set(cached_pages):
+        save_manifest(manifest_path, pages)
+    return results
+
+def build_company_frame(all_companies_data):
+    # Merge and deduplicate companies
+    final_companies = merge_company_data([all_companies_data])
+    
+    # Create DataFrame
+    df = pd.DataFrame(final_companies)
+    
+    # Define required columns
+    required_columns = [
+        'company_name', 'seller_name', 'year_founded', 'hq_location',
+        'twitter_id', 'twitter_followers', 'linkedin_url', 'linkedin_employees',
+        'company_website'
+    ]
+    
+    # Add missing columns
+    for col in required_columns:
+        if col not in df.columns:
+            df[col] = None
+    
+    # Reorder columns and remove duplicates
+    df = df[required_columns + [col for col in df.columns if col not in required_columns]]
+    return df.drop_duplicates(subset=['company_name'], keep='first')
+
+def save_company_frame(df, path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as handle, pd.ExcelWriter(handle, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name="Company_Data", index=False)
+    os.replace(tmp_path, path)
+
+def watch_spool(spool_dir, batch_size=10, max_delay=2.0, poll_interval=0.5, fragments_only=False):
+    """Extract pages as they land in spool_dir, writing and uploading one workbook per micro-batch.
+
+    Several watchers may share a spool: each claims pages by renaming them into its own
+    claim directory, so no page is extracted twice. Processed pages move to spool_dir/processed;
+    a batch that fails to extract, save or upload stays claimed and is retried.
+    """
+    claim_dir = worker_claim_dir(spool_dir)
+    processed_dir = os.path.join(spool_dir, "processed")
+    os.makedirs(processed_dir, exist_ok=True)
+    requeue_orphaned_claims(spool_dir)
+    
+    # Pages left in our claim directory (e.g. by a dead worker whose pid we reuse) go first
+    pending = sorted(str(path) for path in Path(claim_dir).iterdir() if path.match(INPUT_PATTERN))
+    first_claimed = None
+    batch_number = 0
+    while True:
+        pending += claim_spool_files(spool_dir, claim_dir, batch_size - len(pending),
+                                     lambda name: Path(name).match(INPUT_PATTERN))
+        if pending and first_claimed is None:
+            first_claimed = time.monotonic()
+        if pending and (len(pending) >= batch_size or time.monotonic() - first_claimed >= max_delay):
+            try:
+                all_companies_data = []
+                for html_file in pending:
+                    all_companies_data.extend(process_single_html_file(html_file, fragments_only))
+                
+                if all_companies_data:
+                    batch_number += 1
+                    out_path = f"{Path(OUT_XLSX).stem}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{batch_number}.xlsx"
+                    save_company_frame(build_company_frame(all_companies_data), out_path)
+                    if not upload_to_webhook(os.path.abspath(out_path)):
+                        raise RuntimeError(f"upload of {out_path} failed")
+            except Exception as e:
+                # The batch stays claimed and is retried after the next poll
+                print(f"Error processing batch of {len(pending)} pages: {e}")
+                first_claimed = None
+                time.sleep(poll_interval)
+                continue
+            
+            for html_file in pending:
+                os.replace(html_file, os.path.join(processed_dir, os.path.basename(html_file)))
+            pending = []
+            first_claimed = None
+            continue
+        time.sleep(poll_interval)
+
 def upload_to_webhook(file_path):
     """Upload Excel file to n8n webhook using curl."""
     webhook_url = "https://kartikey2710a.app.n8n.cloud/webhook/b2c7d41e-c5b6-4a46-814c-f2a9376b8e8e"
@@ -169,6 +421,33 @@ def upload_to_webhook(file_path):
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description='Extract seller details from G2 listing pages')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Number of worker processes used to parse pages (default: 1)')
+    parser.add_argument('--fragments-only', action='store_true',
+                        help='Parse only the product-card and seller-details fragments instead of the full page')
+    parser.add_argument('--manifest', default=MANIFEST_FILE,
+                        help=f'Per-page extraction manifest used to skip unchanged pages (default: {MANIFEST_FILE})')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Ignore the manifest and re-extract every page')
+    parser.add_argument('--watch', metavar='SPOOL_DIR',
+                        help='Keep running and extract pages as they land in SPOOL_DIR, one workbook per micro-batch')
+    parser.add_argument('--batch-size', type=int, default=10,
+                        help='Pages per micro-batch in watch mode (default: 10)')
+    parser.add_argument('--max-delay', type=float, default=2.0,
+                        help='Seconds a claimed page may wait for its batch to fill in watch mode (default: 2.0)')
+    args = parser.parse_args()
+    
+    if args.watch:
+        watchers = [Process(target=watch_spool, args=(args.watch, args.batch_size, args.max_delay),
+                            kwargs={'fragments_only': args.fragments_only})
+                    for _ in range(max(1, args.workers))]
+        for watcher in watchers:
+            watcher.start()
+        for watcher in watchers:
+            watcher.join()
+        return
+    
     html_files = glob.glob(INPUT_PATTERN)
     
     if not html_files:
@@ -182,38 +461,17 @@ def main():
     
     all_companies_data = []
     
-    for html_file in html_files:
-        companies_from_page = process_single_html_file(html_file)
+    companies_by_page = process_html_files_incremental(
+        html_files, args.manifest, args.workers, args.fragments_only, args.rebuild
+    )
+    for companies_from_page in companies_by_page:
         all_companies_data.extend(companies_from_page)
     
     if not all_companies_data:
         return
     
-    # Merge and deduplicate companies
-    final_companies = merge_company_data([all_companies_data])
-    
-    # Create DataFrame
-    df = pd.DataFrame(final_companies)
-    
-    # Define required columns
-    required_columns = [
-        'company_name', 'seller_name', 'year_founded', 'hq_location',
-        'twitter_id', 'twitter_followers', 'linkedin_url', 'linkedin_employees',
-        'company_website'
-    ]
-    
-    # Add missing columns
-    for col in required_columns:
-        if col not in df.columns:
-            df[col] = None
-    
-    # Reorder columns and remove duplicates
-    df = df[required_columns + [col for col in df.columns if col not in required_columns]]
-    df = df.drop_duplicates(subset=['company_name'], keep='first')
-    
-    # Save to Excel
-    with pd.ExcelWriter(OUT_XLSX, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name="Company_Data", index=False)
+    df = build_company_frame(all_companies_data)
+    save_company_frame(df, OUT_XLSX)
     
     # Upload to webhook
     if os.path.exists(OUT_XLSX):
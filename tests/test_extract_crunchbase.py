@@ -0,0 +1,96 @@
+"""The Crunchbase results extractor must find the organizations its old span regexes found."""
+
+import importlib.util
+import json
+import os
+import random
+import re
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'crunchBase-Results')
+spec = importlib.util.spec_from_file_location('extract_crunchbase',
+                                              os.path.join(RESULTS_DIR, 'extract.crunchBase.py'))
+extract = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(extract)
+
+ORG_PATTERN = r'"organization"[^}]*?"identifier"[^}]*?"value":\s*"([^"]+)"[^}]*?"name":\s*"([^"]+)"'
+COMPANY_PATTERN = r'"name":\s*"([^"]+)"[^}]*?"permalink":\s*"([^"]+)"'
+
+SHAPES = [
+    {"name": "Acme Rockets", "identifier": {"permalink": "acme-rockets", "value": "acme"}},
+    {"organization": {"properties": {"identifier": {"value": "beta-co", "name": "Beta Company"}}}},
+    {"entity_def_id": "organization", "identifier": "acme-x", "value": "acmex", "name": "Acme Xylo"},
+    {"organization": {"identifier": {"value": "gamma"}, "name": "Gamma"}},
+    {"organization": "identifier", "value": "delta", "tags": ["x}y"], "name": "Delta"},
+    {"organization": "a}b", "identifier": "x", "value": "eps", "name": "Epsilon"},
+    {"entities": [{"name": "One", "permalink": "one"}, {"name": "Two", "x": {"permalink": "two"}}]},
+    {"name": "", "permalink": "blank", "more": {"name": "Three", "permalink": "three}"}},
+]
+
+KEYS = ['organization', 'identifier', 'value', 'name', 'permalink', 'properties', 'a}b', 'x']
+STRINGS = ['organization', 'identifier', 'value', 'name', 'Acme', 'beta-co', '', 'b}c', 'Co']
+
+
+def regex_records(value):
+    text = json.dumps(value)
+    return ([{'identifier': identifier, 'name': name} for identifier, name in re.findall(ORG_PATTERN, text)] +
+            [{'name': name, 'permalink': permalink} for name, permalink in re.findall(COMPANY_PATTERN, text)])
+
+
+def random_value(rng, depth=0):
+    roll = rng.random()
+    if depth > 3 or roll < 0.35:
+        return rng.choice(STRINGS + [1, None])
+    if roll < 0.5:
+        return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+    return {rng.choice(KEYS): random_value(rng, depth + 1) for _ in range(rng.randint(0, 5))}
+
+
+def test_reviewed_shapes():
+    for shape in SHAPES:
+        assert list(extract.iter_organizations(shape)) == regex_records(shape), shape
+
+
+def test_random_json():
+    rng = random.Random(15)
+    for _ in range(5000):
+        value = {rng.choice(KEYS): random_value(rng) for _ in range(rng.randint(1, 5))}
+        assert list(extract.iter_organizations(value)) == regex_records(value), value
+
+
+NAME_ONLY = {'Name': 'Acme  Rockets', 'Identifier': '', 'URL': ''}
+IDENTIFIED = {'Name': 'Acme Rockets', 'Identifier': 'acme-rockets',
+              'URL': 'https://www.crunchbase.com/organization/acme-rockets'}
+
+
+def stored(conn):
+    return conn.execute('SELECT name, identifier, org_key FROM organizations ORDER BY id').fetchall()
+
+
+def open_empty_store(tmp_path):
+    return extract.open_store(str(tmp_path / 'orgs.db'), seed_excel=str(tmp_path / 'missing.xlsx'))
+
+
+def test_identified_record_replaces_stored_name_only_row(tmp_path):
+    conn = open_empty_store(tmp_path)
+    assert extract.upsert_organizations(conn, [{'Name': 'Other'}, NAME_ONLY]) == 2
+    assert extract.upsert_organizations(conn, [IDENTIFIED]) == 0
+    assert stored(conn) == [('Other', '', 'name:other'),
+                            ('Acme Rockets', 'acme-rockets', 'id:acme-rockets')]
+
+
+def test_name_only_record_skipped_after_identified_row(tmp_path):
+    conn = open_empty_store(tmp_path)
+    assert extract.upsert_organizations(conn, [IDENTIFIED]) == 1
+    assert extract.upsert_organizations(conn, [NAME_ONLY]) == 0
+    assert stored(conn) == [('Acme Rockets', 'acme-rockets', 'id:acme-rockets')]
+
+
+def test_stale_name_only_row_dropped_when_identified_row_exists(tmp_path):
+    conn = open_empty_store(tmp_path)
+    extract.upsert_organizations(conn, [IDENTIFIED])
+    # A store from before reconciliation can hold both
+    with conn:
+        conn.execute("INSERT INTO organizations (name, name_key, org_key) "
+                     "VALUES ('Acme Rockets', 'acme rockets', 'name:acme rockets')")
+    assert extract.upsert_organizations(conn, [IDENTIFIED]) == 0
+    assert stored(conn) == [('Acme Rockets', 'acme-rockets', 'id:acme-rockets')]
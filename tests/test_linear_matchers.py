@@ -0,0 +1,79 @@
+"""Every LinearMatcher in crunchbase.extractor must agree with the regex it replaces."""
+
+import importlib.util
+import os
+import random
+import re
+import sys
+
+import pytest
+
+DATA_EXTRACTOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'data_extractor')
+sys.path.insert(0, DATA_EXTRACTOR)
+spec = importlib.util.spec_from_file_location('crunchbase_extractor',
+                                              os.path.join(DATA_EXTRACTOR, 'crunchbase.extractor.py'))
+extractor = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(extractor)
+
+MATCHERS = [(matcher, flags) for specs in extractor.PATTERN_SPECS.values()
+            for matcher, flags in specs if isinstance(matcher, extractor.LinearMatcher)]
+MATCHER_IDS = [type(matcher).__name__ for matcher, _ in MATCHERS]
+
+# Fragments each matcher keys on, plus the separators and letter runs that make the originals backtrack
+TOKENS = [
+    'Acme', 'jane', 'Doe', 'X', 'b', 'and', 'AND', 'Co-Founder', 'co-founder', 'founder', 'investor',
+    'Investors', '$1,200M', '$5K', '$', '7', 'IT', 'it', 'spend', 'Spend', 'About', 'about',
+    '&', ':', ',', '.', ' ', ' ', '  ', '\n', '\t', '-',
+]
+
+ADVERSARIAL = [
+    '',
+    'A' * 120,
+    'A' * 60 + ' and ' + 'B' * 60,
+    'Jane Doe and John Roe' + ' x' * 50 + '\nCo-Founder',
+    'Jane Doe and John Roe are co-founders',
+    'Jane Doe and\nJohn Roe\nfounder',
+    'Jane and Joe and Jim and Jill founder and Jack and Jen investor',
+    'Sequoia and Accel and Index are lead investors',
+    'Sequoia and Accel\nare investors',
+    'Jane Doe: Co-Founder, John Roe:  co-founder',
+    'Jane Doe:\n\nCo-Founder',
+    '$12,000M in IT spend per year',
+    '$12,000M\nIT spend',
+    '$3 per IT seat, no spend\n$4 IT and spend',
+    'San Francisco, California, United States.',
+    'San Francisco, California, United States',
+    'A, B, C, D, E.',
+    'San Francisco ,California,United States and more.',
+    'About\n' + 'x' * 49 + '.',
+    'About\n' + 'x' * 50 + '.',
+    'About us\nshort.\n' + 'y' * 400 + '.\n' + 'z' * 80 + '.',
+    'about ' + 'About ' * 40 + '\n' + 'w' * 60 + '.',
+]
+
+
+def random_texts(seed, count, max_tokens=40):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(TOKENS) for _ in range(rng.randint(0, max_tokens))) for _ in range(count)]
+
+
+def assert_equivalent(matcher, flags, text):
+    regex = re.compile(matcher.pattern, flags)
+    if hasattr(matcher, 'findall'):
+        assert matcher.findall(text) == regex.findall(text), (matcher.pattern, text)
+    else:
+        expected = regex.search(text)
+        found = matcher.search(text)
+        assert (found and found.group(1)) == (expected and expected.group(1)), (matcher.pattern, text)
+
+
+@pytest.mark.parametrize('matcher, flags', MATCHERS, ids=MATCHER_IDS)
+def test_adversarial_inputs(matcher, flags):
+    for text in ADVERSARIAL:
+        assert_equivalent(matcher, flags, text)
+
+
+@pytest.mark.parametrize('matcher, flags', MATCHERS, ids=MATCHER_IDS)
+def test_random_token_strings(matcher, flags):
+    for text in random_texts(seed=len(matcher.pattern), count=3000):
+        assert_equivalent(matcher, flags, text)